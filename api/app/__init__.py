@@ -3,21 +3,42 @@ from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from config import config
+from .cache import LRUCache
+from .json_provider import FastJSONProvider
+from .pool import PoolStats, configure_pool
+from .routing import RoutingSession, init_replicas
+from .timing import init_timing
 
-db = SQLAlchemy()
+# Responses are built from the objects just written, so keep their state after commit
+db = SQLAlchemy(session_options={'class_': RoutingSession, 'expire_on_commit': False})
 migrate = Migrate()
 
 def create_app(config_name):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
 
+    configure_pool(app)
 
     db.init_app(app)
     migrate.init_app(app, db)
-    CORS(app)
+    init_replicas(app)
+    app.extensions['pool_stats'] = PoolStats()
+    with app.app_context():
+        app.extensions['pool_stats'].attach(db.engine)
+    app.extensions['replica_pool_stats'] = [PoolStats() for engine in app.extensions['database_replicas']]
+    for engine, stats in zip(app.extensions['database_replicas'], app.extensions['replica_pool_stats']):
+        stats.attach(engine)
+    CORS(app, expose_headers=['X-Next-Cursor', 'Server-Timing'])
+    init_timing(app)
+    app.extensions['template_cache'] = LRUCache(app.config['TEMPLATE_CACHE_SIZE'])
+    app.extensions['validator_cache'] = LRUCache(app.config['TEMPLATE_CACHE_SIZE'])
 
     from .main import main as main_blueprint
     app.register_blueprint(main_blueprint, url_prefix='/api')
 
+    from .commands import register_commands
+    register_commands(app)
+
     return app
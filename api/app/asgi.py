@@ -0,0 +1,170 @@
+"""ASGI entry point serving the hot read routes with an async SQLAlchemy session.
+
+``GET /api/contracts/templates/<id>``, ``GET /api/contracts/<id>`` and ``GET /api/employees/<id>``
+are answered on the event loop with an ``AsyncSession`` (asyncpg on PostgreSQL, aiosqlite on
+SQLite), reusing the models, serializers and template cache of the Flask app. Every other request
+is handed to the Flask app through ``asgiref``'s WSGI adapter, which runs it in a thread.
+"""
+import random
+import re
+from urllib.parse import parse_qsl
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.http import parse_cookie, parse_etags, quote_etag
+from . import create_app
+from .filters import parse_fields
+from .main.views import fields_etag
+from .models import Contract, ContractTemplate, Employee
+from .routing import read_primary
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:
+    WsgiToAsgi = None
+
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+def async_database_uri(database_uri):
+    """Return ``database_uri`` with its driver replaced by the async driver of the same database."""
+    scheme, separator, rest = database_uri.partition('://')
+    dialect = scheme.split('+')[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver is configured for {dialect} databases')
+    return ASYNC_DRIVERS[dialect] + separator + rest
+
+def async_engine_options(options):
+    """Translate the sync engine or replica options; the pool class and the psycopg2 connect arguments do not apply."""
+    statement_timeout = re.search(r'statement_timeout=(\d+)', options.get('connect_args', {}).get('options', ''))
+    options = {key: value for key, value in options.items() if key not in ('url', 'poolclass', 'connect_args')}
+    if statement_timeout:
+        options['connect_args'] = {'server_settings': {'statement_timeout': statement_timeout.group(1)}}
+    return options
+
+class AsyncReadApp:
+    """ASGI application answering the read routes asynchronously and delegating the rest to ``flask_app``.
+
+    Like ``RoutingSession``, the reads go to a random read replica when some are configured, unless
+    the client asked to read its own writes.
+    """
+
+    def __init__(self, flask_app):
+        if WsgiToAsgi is None:
+            raise RuntimeError('The ASGI entry point requires asgiref, see requirements-asgi.txt')
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = create_async_engine(async_database_uri(flask_app.config['SQLALCHEMY_DATABASE_URI']),
+                                          **async_engine_options(flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})))
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.replica_engines = [create_async_engine(async_database_uri(options['url']), **async_engine_options(options))
+                                for options in flask_app.config.get('SQLALCHEMY_REPLICAS', [])]
+        self.replica_sessions = [async_sessionmaker(engine, expire_on_commit=False) for engine in self.replica_engines]
+        self.routes = [
+            (re.compile(r'/api/contracts/templates/(\d+)'), self.get_contract_template),
+            (re.compile(r'/api/contracts/(\d+)'), self.get_contract),
+            (re.compile(r'/api/employees/(\d+)'), self.get_employee)
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        view = self.match(scope) if scope['type'] == 'http' else None
+        if view is None:
+            return await self.wsgi(scope, receive, send)
+
+        view, id = view
+        headers = Headers([(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']])
+        args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1')))
+        sessionmaker = self.session
+        if self.replica_sessions and not read_primary(parse_cookie(headers.get('cookie')), headers):
+            sessionmaker = random.choice(self.replica_sessions)
+        async with sessionmaker() as session:
+            status, body, response_headers = await view(session, id, args, headers)
+        await self.respond(send, status, body, response_headers, headers.get('origin'))
+
+    def match(self, scope):
+        if scope['method'] != 'GET':
+            return None
+        for pattern, view in self.routes:
+            match = pattern.fullmatch(scope['path'])
+            if match:
+                return view, int(match.group(1))
+        return None
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispose(self):
+        for engine in [self.engine] + self.replica_engines:
+            await engine.dispose()
+
+    async def respond(self, send, status, body, headers, origin):
+        headers = dict(headers)
+        if body is not None:
+            body = self.flask_app.json.dumps(body).encode() + b'\n'
+            headers['content-type'] = self.flask_app.json.mimetype
+        else:
+            body = b''
+        headers['content-length'] = str(len(body))
+        if origin:
+            # Same headers as Flask-CORS adds to the WSGI responses
+            headers.update({'access-control-allow-origin': origin, 'access-control-expose-headers': 'Server-Timing, X-Next-Cursor', 'vary': 'Origin'})
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def get_employee(self, session, id, args, headers):
+        employee = await session.get(Employee, id)
+        if employee:
+            return 200, employee.to_dict(), {}
+        return 404, {'error': 'Employee not found'}, {}
+
+    async def get_contract(self, session, id, args, headers):
+        fields, error = parse_fields(args, Contract.FIELDS)
+        if error:
+            return 400, error, {}
+
+        contract = await session.scalar(select(Contract).options(*Contract.load_options(fields)).filter_by(id=id))
+        if contract:
+            return 200, contract.to_dict(fields), {}
+        return 404, {'error': 'Contract not found'}, {}
+
+    async def get_contract_template(self, session, id, args, headers):
+        fields, error = parse_fields(args, ContractTemplate.FIELDS)
+        if error:
+            return 400, error, {}
+
+        version = await session.scalar(select(ContractTemplate.version).filter_by(id=id))
+        if version is None:
+            return 404, {'error': 'Contract template not found'}, {}
+
+        etag = fields_etag(f'template-{id}-{version}', fields)
+        cache_headers = {'etag': quote_etag(etag), 'cache-control': 'no-cache'}
+        if parse_etags(headers.get('if-none-match')).contains(etag):
+            return 304, None, cache_headers
+
+        cache = self.flask_app.extensions['template_cache']
+        document = cache.get(id, version)
+        if document is None:
+            result = await session.scalars(select(ContractTemplate).options(*ContractTemplate.load_options()).filter_by(id=id))
+            template = result.unique().one_or_none()
+            if not template:
+                return 404, {'error': 'Contract template not found'}, {}
+            version = template.version
+            document = ContractTemplate.to_dict_list([template])[0]
+            cache.set(id, version, document, dependencies=template.elements)
+
+        if fields is not None:
+            document = {key: value for key, value in document.items() if key in fields}
+        return 200, document, {'etag': quote_etag(fields_etag(f'template-{id}-{version}', fields)), 'cache-control': 'no-cache'}
+
+def create_asgi_app(config_name):
+    return AsyncReadApp(create_app(config_name))
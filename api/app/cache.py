@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache of serialized documents keyed by ``(key, version)``.
+
+    Only one version is kept per key and a lookup with another version is a miss. Each entry
+    may declare dependencies (for templates, the ids of their elements) so that a change to a
+    dependency evicts every entry built from it.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._dependents = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, version, value, dependencies=()):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (version, value, frozenset(dependencies))
+            for dependency in dependencies:
+                self._dependents.setdefault(dependency, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._invalidate(key)
+
+    def invalidate_dependency(self, dependency):
+        with self._lock:
+            for key in list(self._dependents.get(dependency, ())):
+                self._invalidate(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+    def _invalidate(self, key):
+        if self._remove(key):
+            self.invalidations += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for dependency in entry[2]:
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[dependency]
+        return True
+
+def template_cache():
+    return current_app.extensions['template_cache']
+
+def validator_cache():
+    return current_app.extensions['validator_cache']
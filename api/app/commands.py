@@ -0,0 +1,90 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, insert, select
+from . import db
+from .exports import EXPORT_FORMATS, export_contracts
+from .filters import contract_filters
+from .imports import IMPORT_FORMATS, import_employees, parse_rows
+from .models import Contract, ContractFieldValue, InputField
+
+@click.command('export-contracts')
+@click.option('--format', 'export_format', type=click.Choice(EXPORT_FORMATS), default='ndjson', show_default=True)
+@click.option('--output', type=click.File('w'), default='-', help='File to write to, defaults to stdout.')
+@click.option('--signed-date', help='Only export contracts signed on this date (YYYY-MM-DD).')
+@click.option('--template-id', type=int, help='Only export contracts created from this template.')
+@click.option('--employee-id', type=int, help='Only export contracts signed by this employee.')
+@click.option('--company-id', type=int, help='Only export contracts signed by employees of this company.')
+@click.option('--signed-from', help='Only export contracts signed on or after this date (YYYY-MM-DD).')
+@click.option('--signed-to', help='Only export contracts signed on or before this date (YYYY-MM-DD).')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Rows fetched per database round trip.')
+@with_appcontext
+def export_contracts_command(export_format, output, batch_size, **filters):
+    """Stream contracts as NDJSON or CSV."""
+    criteria, error = contract_filters(filters)
+    if error:
+        raise click.UsageError(error['error'])
+
+    for chunk in export_contracts(criteria, export_format, batch_size):
+        output.write(chunk)
+
+def backfill_field_values(chunk_size):
+    """Rebuild the field values of every contract, one committed chunk at a time, yielding progress."""
+    input_fields = InputField.__table__
+    last_id = 0
+    while True:
+        contracts = db.session.execute(
+            select(Contract.id, Contract.contract_data).where(Contract.id > last_id).order_by(Contract.id).limit(chunk_size)
+        ).all()
+        if not contracts:
+            break
+
+        field_ids = {int(field_id) for _, contract_data in contracts for field_id in contract_data if field_id.isdigit()}
+        input_types = {}
+        if field_ids:
+            query = select(input_fields.c.id, input_fields.c.input_type).where(input_fields.c.id.in_(field_ids))
+            input_types = {str(field_id): input_type for field_id, input_type in db.session.execute(query)}
+
+        contract_ids = [contract_id for contract_id, _ in contracts]
+        rows = [row for contract_id, contract_data in contracts for row in ContractFieldValue.rows(contract_id, contract_data, input_types)]
+        db.session.execute(delete(ContractFieldValue).where(ContractFieldValue.contract_id.in_(contract_ids)))
+        if rows:
+            db.session.execute(insert(ContractFieldValue), rows)
+        db.session.commit()
+
+        last_id = contract_ids[-1]
+        yield len(contracts), len(rows)
+
+@click.command('backfill-field-values')
+@click.option('--chunk-size', type=int, default=1000, show_default=True, help='Contracts processed per transaction.')
+@with_appcontext
+def backfill_field_values_command(chunk_size):
+    """Populate contract_field_values from existing contracts."""
+    contract_count = 0
+    value_count = 0
+    for contracts, values in backfill_field_values(chunk_size):
+        contract_count += contracts
+        value_count += values
+        click.echo(f'Processed {contract_count} contracts, {value_count} field values', err=True)
+
+    click.echo(f'Backfilled {value_count} field values for {contract_count} contracts')
+
+@click.command('import-employees')
+@click.argument('input', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--format', 'import_format', type=click.Choice(IMPORT_FORMATS), default='csv', show_default=True)
+@click.option('--company-id', type=int, help='Company of the rows without a company_id column.')
+@click.option('--chunk-size', type=int, default=1000, show_default=True, help='Employees inserted per transaction.')
+@with_appcontext
+def import_employees_command(input, import_format, company_id, chunk_size):
+    """Import employees from a CSV or NDJSON file with name, email and company_id."""
+    summary = None
+    for summary in import_employees(parse_rows(input, import_format), company_id, chunk_size):
+        click.echo(f"Inserted {summary['inserted']}, skipped {summary['skipped']}, rejected {summary['rejected']}", err=True)
+
+    for error in summary['errors']:
+        click.echo(f"Line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {summary['inserted']} employees, skipped {summary['skipped']} duplicates, rejected {summary['rejected']} rows")
+
+def register_commands(app):
+    app.cli.add_command(export_contracts_command)
+    app.cli.add_command(backfill_field_values_command)
+    app.cli.add_command(import_employees_command)
@@ -0,0 +1,43 @@
+import csv
+import io
+from flask import current_app
+from sqlalchemy import select
+from . import db
+from .models import Contract
+
+EXPORT_FORMATS = ['ndjson', 'csv']
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+CSV_COLUMNS = ['id', 'employee_id', 'template_id', 'signed_date', 'contract_data']
+
+def iter_contracts(criteria, batch_size=1000):
+    statement = select(Contract).where(*criteria).order_by(Contract.id).execution_options(yield_per=batch_size)
+    return db.session.scalars(statement)
+
+def ndjson_lines(contracts):
+    dumps = current_app.json.dumps
+    for contract in contracts:
+        yield dumps(contract.to_dict()) + '\n'
+
+def csv_lines(contracts):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+
+    dumps = current_app.json.dumps
+    for contract in contracts:
+        record = contract.to_dict()
+        record['contract_data'] = dumps(record['contract_data'])
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+def export_contracts(criteria, export_format, batch_size=1000):
+    """Yield the contracts matching ``criteria`` as NDJSON or CSV chunks, one row at a time."""
+    contracts = iter_contracts(criteria, batch_size)
+    if export_format == 'csv':
+        return csv_lines(contracts)
+    return ndjson_lines(contracts)
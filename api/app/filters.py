@@ -0,0 +1,85 @@
+import operator
+from datetime import date
+from sqlalchemy import and_, func, select, type_coerce
+from sqlalchemy.dialects import postgresql
+from . import db
+from .models import Contract, ContractFieldValue, Employee
+
+def parse_id(args, key):
+    value = args.get(key)
+    if value is None or value == '':
+        return None, None
+    try:
+        return int(value), None
+    except (TypeError, ValueError):
+        return None, {'error': f'{key} must be an integer'}
+
+def parse_date(args, key):
+    value = args.get(key)
+    if not value:
+        return None, None
+    try:
+        return date.fromisoformat(value), None
+    except ValueError:
+        return None, {'error': f'{key} must be a date in YYYY-MM-DD format'}
+
+def parse_fields(args, allowed):
+    """Parse the comma separated ``fields`` argument, returning ``(fields, error)`` with ``None`` for every field."""
+    value = args.get('fields')
+    if not value:
+        return None, None
+    fields = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        return None, {'error': f"Unknown fields: {', '.join(sorted(unknown))}"}
+    return fields, None
+
+def contract_filters(args):
+    """Build contract filter criteria from request or CLI arguments, returning ``(criteria, error)``."""
+    criteria = []
+
+    for key, column in (('employee_id', Contract.employee_id), ('template_id', Contract.template_id)):
+        value, error = parse_id(args, key)
+        if error:
+            return None, error
+        if value is not None:
+            criteria.append(column == value)
+
+    company_id, error = parse_id(args, 'company_id')
+    if error:
+        return None, error
+    if company_id is not None:
+        criteria.append(Contract.employee_id.in_(select(Employee.id).where(Employee.company_id == company_id)))
+
+    for key, compare in (('signed_date', operator.eq), ('signed_from', operator.ge), ('signed_to', operator.le)):
+        value, error = parse_date(args, key)
+        if error:
+            return None, error
+        if value is not None:
+            criteria.append(compare(Contract.signed_date, value))
+
+    return criteria, None
+
+def contract_data_filter(contract_data):
+    """Build a criterion matching contracts whose data contains ``contract_data``, returning ``(criterion, error)``.
+
+    Scalar values must be equal, objects and arrays must be contained in the stored value. Other
+    databases only support scalar values and look non-empty ones up in ``contract_field_values``.
+    """
+    if not contract_data or not isinstance(contract_data, dict):
+        return None, {'error': 'Contract data must be a non-empty JSON object'}
+
+    if db.engine.dialect.name == 'postgresql':
+        # Answered by the jsonb_path_ops GIN index
+        return type_coerce(Contract.contract_data, postgresql.JSONB).contains(contract_data), None
+
+    criteria = []
+    for field_id, value in contract_data.items():
+        if isinstance(value, (dict, list)) or '"' in field_id:
+            return None, {'error': 'Only scalar values can be searched on this database'}
+        criteria.append(func.json_extract(Contract.contract_data, f'$."{field_id}"') == value)
+        if value and field_id.isdigit():
+            # Answered by the (element_id, value) index, json_extract above still tells 5 from "5"
+            criteria.append(Contract.id.in_(select(ContractFieldValue.contract_id).where(
+                ContractFieldValue.element_id == int(field_id), ContractFieldValue.value_matches(value))))
+    return and_(*criteria), None
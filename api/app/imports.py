@@ -0,0 +1,116 @@
+import csv
+import json
+import re
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from . import db
+from .models import Company, Employee
+
+IMPORT_FORMATS = ['csv', 'ndjson']
+# Matched with fullmatch, so the whole value must be one address
+EMAIL_REGEX = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+MAX_REPORTED_ERRORS = 100
+UPSERT_DIALECTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+employees = Employee.__table__
+
+def parse_rows(lines, import_format):
+    """Yield ``(line, row)`` for every record of ``lines``, with ``None`` as row when a record cannot be parsed."""
+    if import_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+def employee_row(row, company_id):
+    """Validate one imported record, returning ``(values, error)``."""
+    if row is None:
+        return None, 'Invalid record'
+    name = str(row.get('name') or '').strip()
+    email = str(row.get('email') or '').strip()
+    if not name or not email:
+        return None, 'Missing name or email'
+    if len(name) > employees.c.name.type.length or len(email) > employees.c.email.type.length:
+        return None, 'Name or email is too long'
+    if not EMAIL_REGEX.fullmatch(email):
+        return None, 'Email is not valid'
+
+    row_company_id = row.get('company_id') or company_id
+    try:
+        row_company_id = int(row_company_id)
+    except (TypeError, ValueError):
+        return None, 'Missing or invalid company_id'
+    return {'company_id': row_company_id, 'name': name, 'email': email}, None
+
+def insert_employees(rows):
+    """Insert ``rows`` skipping the emails that already exist, returning how many were inserted."""
+    # Core statements on the table skip the ORM bulk machinery
+    upsert = UPSERT_DIALECTS.get(db.engine.dialect.name)
+    if upsert is not None:
+        statement = upsert(employees).on_conflict_do_nothing(index_elements=[employees.c.email]).returning(employees.c.id)
+        return len(db.session.execute(statement, rows).all())
+
+    existing = set(db.session.scalars(select(employees.c.email).where(employees.c.email.in_([row['email'] for row in rows]))))
+    rows = [row for row in rows if row['email'] not in existing]
+    if rows:
+        db.session.execute(insert(employees), rows)
+    return len(rows)
+
+def import_employees(records, company_id=None, chunk_size=1000):
+    """Import the ``(line, row)`` records of ``parse_rows`` one committed chunk at a time.
+
+    Rows whose email is repeated in the import or already taken are skipped, invalid rows are
+    rejected. Yields the running summary after every chunk.
+    """
+    summary = {'inserted': 0, 'skipped': 0, 'rejected': 0, 'errors': []}
+    companies = {}
+    seen_emails = set()
+    chunk = []
+
+    def reject(line, error):
+        summary['rejected'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line, 'error': error})
+
+    def flush():
+        unknown = {row['company_id'] for _, row in chunk if row['company_id'] not in companies}
+        if unknown:
+            found = set(db.session.scalars(select(Company.id).where(Company.id.in_(unknown))))
+            companies.update((unknown_id, unknown_id in found) for unknown_id in unknown)
+
+        rows = []
+        for line, row in chunk:
+            if companies[row['company_id']]:
+                rows.append(row)
+            else:
+                reject(line, 'Company not found')
+        if rows:
+            inserted = insert_employees(rows)
+            db.session.commit()
+            summary['inserted'] += inserted
+            summary['skipped'] += len(rows) - inserted
+        del chunk[:]
+
+    for line, record in records:
+        row, error = employee_row(record, company_id)
+        if error:
+            reject(line, error)
+        elif row['email'] in seen_emails:
+            summary['skipped'] += 1
+        else:
+            seen_emails.add(row['email'])
+            chunk.append((line, row))
+            if len(chunk) >= chunk_size:
+                flush()
+                yield summary
+
+    flush()
+    yield summary
@@ -0,0 +1,45 @@
+import base64
+import binascii
+from flask import current_app, jsonify, request
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+def paginate(query, column):
+    """Return one keyset page of ``query`` ordered by ``column`` as ``(items, next_cursor, error)``."""
+    limit = request.args.get('limit', current_app.config['API_PAGE_SIZE'])
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return None, None, {'error': 'Limit must be a positive integer'}
+    limit = min(limit, current_app.config['API_MAX_PAGE_SIZE'])
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        last_id = decode_cursor(cursor)
+        if last_id is None:
+            return None, None, {'error': 'Invalid cursor'}
+        query = query.filter(column > last_id)
+
+    items = query.order_by(column).limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(getattr(items[-1], column.key))
+
+    return items, next_cursor, None
+
+def page_response(items_list, next_cursor):
+    response = jsonify(items_list)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
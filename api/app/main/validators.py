@@ -1,11 +1,39 @@
-from ..models import ContractElement
+import re
+from collections import namedtuple
+from types import MappingProxyType
+from sqlalchemy import and_, case, func, select
+from .. import db
+from ..cache import validator_cache
+from ..imports import EMAIL_REGEX
+from ..models import ContractElement, InputField, TemplateElement
+
+INPUT_FORMATS = {
+    'email': EMAIL_REGEX,
+    'phone': re.compile(r"\+?[0-9(][0-9 ().-]{5,18}[0-9]")
+}
 
 def validate_contract_elements(elements):
     if len(elements) != len(set(elements)):
         return {'error': 'Duplicate elements are not allowed'}
 
-    existing_elements = ContractElement.query.filter(ContractElement.id.in_(elements)).all()
-    existing_element_ids = {element.id for element in existing_elements}
+    existing_element_ids = set()
+    paragraph_count = 0
+    signature_count = 0
+    if elements:
+        # One round trip: the found ids plus window aggregates of the mandatory paragraphs and signatures
+        contract_elements = ContractElement.__table__
+        input_fields = InputField.__table__
+        mandatory = contract_elements.c.is_optional.isnot(True)
+        query = select(
+            contract_elements.c.id,
+            func.sum(case((and_(mandatory, contract_elements.c.element_type == 'paragraph'), 1), else_=0)).over(),
+            func.sum(case((and_(mandatory, input_fields.c.input_type == 'signature'), 1), else_=0)).over()
+        ).select_from(
+            contract_elements.outerjoin(input_fields, input_fields.c.id == contract_elements.c.id)
+        ).where(contract_elements.c.id.in_(elements))
+
+        for element_id, paragraph_count, signature_count in db.session.execute(query):
+            existing_element_ids.add(element_id)
 
     if len(existing_element_ids) != len(elements):
         missing_element_ids = [element_id for element_id in elements if element_id not in existing_element_ids]
@@ -14,19 +42,83 @@ def validate_contract_elements(elements):
     if len(elements) < 3:
         return {'error': 'A contract template must have at least three elements'}
 
-    paragraph_count = 0
-    signature_count = 0
-
-    for element in existing_elements:
-        if not element.is_optional:
-            if element.element_type == 'paragraph':
-                paragraph_count += 1
-            elif element.element_type == 'input_field' and element.input_type == 'signature':
-                signature_count += 1
-
     if paragraph_count < 2:
         return {'error': 'A contract template must have at least two paragraphs non optionals'}
     if signature_count < 1:
         return {'error': 'A contract template must have at least one input field of type "signature" non optional'}
 
     return None
+
+def template_input_fields(templates):
+    """Return the ordered element ids and input fields of each template by id, with one query."""
+    element_ids = {template.id: [] for template in templates}
+    input_fields = {template.id: [] for template in templates}
+    if templates:
+        rows = db.session.execute(
+            select(TemplateElement.template_id, TemplateElement.element_id, InputField)
+            .outerjoin(InputField, InputField.id == TemplateElement.element_id)
+            .where(TemplateElement.template_id.in_(element_ids))
+            .order_by(TemplateElement.template_id, TemplateElement.position)
+        )
+        for template_id, element_id, input_field in rows:
+            element_ids[template_id].append(element_id)
+            if input_field is not None:
+                input_fields[template_id].append(input_field)
+
+    return element_ids, input_fields
+
+class ContractValidator(namedtuple('ContractValidator', ['template_id', 'version', 'order', 'required', 'optional', 'input_types', 'names'])):
+    """Immutable contract data validator compiled from the input fields of one template version."""
+    __slots__ = ()
+
+    @classmethod
+    def compile(cls, template, input_fields):
+        field_ids = tuple(str(input_field.id) for input_field in input_fields)
+        return cls(
+            template_id=template.id,
+            version=template.version,
+            order=field_ids,
+            required=frozenset(str(input_field.id) for input_field in input_fields if not input_field.is_optional),
+            optional=frozenset(str(input_field.id) for input_field in input_fields if input_field.is_optional),
+            input_types=MappingProxyType({str(input_field.id): input_field.input_type for input_field in input_fields}),
+            names=MappingProxyType({str(input_field.id): input_field.name for input_field in input_fields})
+        )
+
+    def validate(self, contract_data):
+        unknown = contract_data.keys() - self.required - self.optional
+        if unknown:
+            return {'error': f"Contract data for unknown input fields: {', '.join(sorted(unknown))}"}
+
+        provided = {field_id for field_id, value in contract_data.items() if value}
+        missing = self.required - provided
+        if missing:
+            field_id = next(field_id for field_id in self.order if field_id in missing)
+            return {'error': f'Missing contract data for input field: {self.names[field_id]}'}
+
+        for field_id in self.order:
+            pattern = INPUT_FORMATS.get(self.input_types[field_id])
+            value = contract_data.get(field_id)
+            if pattern and field_id in provided and not (isinstance(value, str) and pattern.fullmatch(value)):
+                return {'error': f'Invalid {self.input_types[field_id]} for input field: {self.names[field_id]}'}
+
+        return None
+
+def contract_validators(templates):
+    """Return the validator of each template by id, compiling only those missing from the cache."""
+    cache = validator_cache()
+    validators = {}
+    stale_templates = []
+    for template in templates:
+        validator = cache.get(template.id, template.version)
+        if validator is None:
+            stale_templates.append(template)
+        else:
+            validators[template.id] = validator
+
+    element_ids, input_fields = template_input_fields(stale_templates)
+    for template in stale_templates:
+        validator = ContractValidator.compile(template, input_fields[template.id])
+        cache.set(template.id, template.version, validator, dependencies=element_ids[template.id])
+        validators[template.id] = validator
+
+    return validators
@@ -1,12 +1,37 @@
-from flask import jsonify, request
+from flask import Response, current_app, jsonify, request, stream_with_context
 from datetime import datetime
-import re
+from sqlalchemy import func, insert, select
+import csv
+import io
+import zlib
 from . import main
-from ..models import Company, Employee, ContractTemplate, ContractElement, Contract, Paragraph, Image, InputField 
+from ..models import Company, Employee, ContractTemplate, TemplateElement, ContractElement, Contract, ContractFieldValue, Paragraph, Image, InputField 
 from .. import db
-from .validators import validate_contract_elements
+from ..cache import template_cache, validator_cache
+from ..pool import pool_stats, replica_pool_stats
+from ..exports import EXPORT_FORMATS, EXPORT_MIMETYPES, export_contracts
+from ..imports import EMAIL_REGEX, IMPORT_FORMATS, import_employees, parse_rows
+from ..filters import contract_filters, contract_data_filter, parse_fields, parse_id
+from .validators import validate_contract_elements, contract_validators
+from .pagination import paginate, page_response
 
 ELEMENT_TYPES = ['paragraph', 'image', 'input_field']
+ELEMENT_CLASSES = {'paragraph': Paragraph, 'image': Image, 'input_field': InputField}
+INPUT_TYPES = ['phone', 'signature', 'email', 'address', 'name']
+contract_elements = ContractElement.__table__
+
+def etag_response(response, etag):
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified(etag):
+    return etag_response(current_app.response_class(status=304), etag)
+
+def fields_etag(etag, fields):
+    if fields is None:
+        return etag
+    return f"{etag}-{zlib.crc32(','.join(sorted(fields)).encode())}"
 
 @main.route('/ping', methods=['GET'])
 def index():
@@ -14,15 +39,21 @@ def index():
 
 @main.route('/companies/', methods=['GET'])
 def list_companies():
-    companies = Company.query.all()
+    companies, next_cursor, error = paginate(Company.query, Company.id)
+    if error:
+        return jsonify(error), 400
+
     companies_list = [company.to_dict() for company in companies]
-    return jsonify(companies_list)
+    return page_response(companies_list, next_cursor)
 
 @main.route('/employees/', methods=['GET'])
 def list_employees():
-    employees = Employee.query.all()
+    employees, next_cursor, error = paginate(Employee.query, Employee.id)
+    if error:
+        return jsonify(error), 400
+
     employees_list = [employee.to_dict() for employee in employees]
-    return jsonify(employees_list)
+    return page_response(employees_list, next_cursor)
 
 @main.route('/employees/<int:id>', methods=['GET'])
 def get_employee(id):
@@ -50,8 +81,7 @@ def create_employee():
     if not company:
         return jsonify({"error": "Company not found"}), 404
 
-    email_regex = r"[^@]+@[^@]+\.[^@]+"
-    if not re.match(email_regex, email):
+    if not isinstance(email, str) or not EMAIL_REGEX.fullmatch(email):
         return jsonify({"error": "Email is not valid"}), 400
 
     existing_employee = Employee.query.filter_by(email=email).first()
@@ -64,20 +94,69 @@ def create_employee():
 
     return jsonify(employee.to_dict()), 201
 
+@main.route('/employees/import', methods=['POST'])
+def import_employees_stream():
+    import_format = request.args.get('format', 'csv')
+    if import_format not in IMPORT_FORMATS:
+        return jsonify({'error': f'Import format is not supported, supported formats: {IMPORT_FORMATS}'}), 400
+    company_id, error = parse_id(request.args, 'company_id')
+    if error:
+        return jsonify(error), 400
+
+    # The body is parsed while it is read; chunks are committed as they fill up
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    records = parse_rows(lines, import_format)
+    summary = None
+    try:
+        for summary in import_employees(records, company_id, current_app.config['EMPLOYEE_IMPORT_CHUNK_SIZE']):
+            pass
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        return jsonify({'error': f'Import could not be parsed: {e}', **(summary or {})}), 400
+
+    return jsonify(summary)
+
 @main.route('/contracts/templates/', methods=['GET'])
 def list_contract_templates():
-    templates = ContractTemplate.query.all()
-    templates_list = [template.to_dict() for template in templates]
-    return jsonify(templates_list)
+    fields, error = parse_fields(request.args, ContractTemplate.FIELDS)
+    if error:
+        return jsonify(error), 400
+
+    templates, next_cursor, error = paginate(ContractTemplate.query_with_elements(fields), ContractTemplate.id)
+    if error:
+        return jsonify(error), 400
+
+    templates_list = ContractTemplate.to_dict_list(templates, fields)
+    return page_response(templates_list, next_cursor)
 
 @main.route('/contracts/templates/<int:id>', methods=['GET'])
 def get_contract_template(id):
-    template = ContractTemplate.query.get(id)
-    if template:
-        return jsonify(template.to_dict())
-    else:
+    fields, error = parse_fields(request.args, ContractTemplate.FIELDS)
+    if error:
+        return jsonify(error), 400
+
+    version = db.session.query(ContractTemplate.version).filter_by(id=id).scalar()
+    if version is None:
         return jsonify({'error': 'Contract template not found'}), 404
 
+    etag = fields_etag(f'template-{id}-{version}', fields)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    cache = template_cache()
+    document = cache.get(id, version)
+    if document is None:
+        template = ContractTemplate.get_with_elements(id)
+        if not template:
+            return jsonify({'error': 'Contract template not found'}), 404
+        version = template.version
+        document = ContractTemplate.to_dict_list([template])[0]
+        cache.set(id, version, document, dependencies=template.elements)
+
+    if fields is not None:
+        document = {key: value for key, value in document.items() if key in fields}
+    return etag_response(jsonify(document), fields_etag(f'template-{id}-{version}', fields))
+
 @main.route('/contracts/templates/', methods=['POST'])
 def create_contract_template():
     try:
@@ -107,7 +186,7 @@ def create_contract_template():
 
 @main.route('/contracts/templates/<int:id>', methods=['PUT'])
 def update_contract_template(id):
-    template = ContractTemplate.query.get(id)
+    template = db.session.get(ContractTemplate, id, options=ContractTemplate.load_options())
     if template:
         try:
             data = request.json
@@ -116,34 +195,132 @@ def update_contract_template(id):
 
         name = data.get('name', template.name)
         template.active = data.get('active', template.active)
-        elements = data.get('elements', template.elements)
+        elements = data.get('elements', list(template.elements))
     
         validation_error = validate_contract_elements(elements)
         if validation_error:
             return jsonify(validation_error), 400
 
+        # Elements loaded with the template are reused for the response, only new ones are queried
+        element_mapping = {link.element_id: link.element.to_dict() for link in template.element_links}
+        element_mapping.update(ContractElement.dicts_by_id([element_id for element_id in elements if element_id not in element_mapping]))
+
         template.name = name
-        template.elements = elements
+        if elements != list(template.elements):
+            template.elements = elements
+        template.version = ContractTemplate.version + 1
         db.session.commit()
+        template_cache().invalidate(template.id)
+        validator_cache().invalidate(template.id)
 
-        return jsonify(template.to_dict())
+        return jsonify(template.to_dict(element_mapping))
     else:
         return jsonify({'error': 'Contract template not found'}), 404
 
+@main.route('/contracts/templates/<int:id>/clone', methods=['POST'])
+def clone_contract_template(id):
+    template = db.session.get(ContractTemplate, id, options=ContractTemplate.load_options())
+    if not template:
+        return jsonify({'error': 'Contract template not found'}), 404
+    try:
+        data = request.json
+    except Exception as e:
+        return jsonify({"error": "Invalid JSON payload"}), 400
+
+    name = data.get('name')
+    if not name:
+        return jsonify({'error': ' Name is required to clone contract templates'}), 400
+    existing_template = ContractTemplate.query.filter_by(name=name).first()
+    if existing_template:
+        return jsonify({"error": "A contract template with this name already exists"}), 409
+
+    elements = [link.element for link in template.element_links]
+    if data.get('clone_elements', False):
+        # Copies are named after the clone so that element names stay unique
+        suffix = data.get('element_suffix', f' ({name})')
+        copies = []
+        for element in elements:
+            values = {attribute: getattr(element, attribute) for attribute in element.FIELDS.values() if attribute not in ('id', 'element_type')}
+            values['name'] = f'{element.name}{suffix}'
+            if len(values['name']) > ContractElement.name.type.length:
+                return jsonify({'error': f'Element name {values["name"]!r} is longer than {ContractElement.name.type.length} characters'}), 400
+            copies.append((type(element), values))
+        names = [values['name'] for element_class, values in copies]
+        taken_names = db.session.scalars(select(contract_elements.c.name).where(contract_elements.c.name.in_(names))).all() if names else []
+        if taken_names or len(set(names)) < len(names):
+            return jsonify({'error': f'Elements with these names already exist: {sorted(set(taken_names)) or names}'}), 409
+
+        element_ids = ContractElement.insert_many(copies)
+        element_mapping = {element_id: element_class(id=element_id, **values).to_dict()
+                           for (element_class, values), element_id in zip(copies, element_ids)}
+    else:
+        element_ids = [element.id for element in elements]
+        element_mapping = {element.id: element.to_dict() for element in elements}
+
+    clone = ContractTemplate(name=name, active=data.get('active', template.active), elements=element_ids)
+    db.session.add(clone)
+    db.session.commit()
+
+    return jsonify(clone.to_dict(element_mapping)), 201
+
 @main.route('/contracts/templates/elements/', methods=['GET'])
 def list_template_elements():
-    elements = ContractElement.query.all()
-    elements_list = [element.to_dict() for element in elements]
-    return jsonify(elements_list)
+    fields, error = parse_fields(request.args, ContractElement.field_names())
+    if error:
+        return jsonify(error), 400
+
+    count, total_version, last_id = db.session.query(
+        func.count(ContractElement.id),
+        func.coalesce(func.sum(ContractElement.version), 0),
+        func.max(ContractElement.id)
+    ).one()
+    etag = f'elements-{count}-{total_version}-{last_id}-{zlib.crc32(request.query_string)}'
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    elements, next_cursor, error = paginate(ContractElement.query.options(*ContractElement.load_options(fields)), ContractElement.id)
+    if error:
+        return jsonify(error), 400
+
+    elements_list = [element.to_dict(fields) for element in elements]
+    return etag_response(page_response(elements_list, next_cursor), etag)
 
 @main.route('/contracts/templates/elements/<int:id>', methods=['GET'])
 def get_template_element(id):
-    element = ContractElement.query.get(id)
-    if element:
-        return jsonify(element.to_dict())
-    else:
+    fields, error = parse_fields(request.args, ContractElement.field_names())
+    if error:
+        return jsonify(error), 400
+
+    version = db.session.query(ContractElement.version).filter_by(id=id).scalar()
+    if version is None:
         return jsonify({'error': 'Contract element not found'}), 404
 
+    etag = fields_etag(f'element-{id}-{version}', fields)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    element = ContractElement.query.options(*ContractElement.load_options(fields)).filter_by(id=id).first()
+    if not element:
+        return jsonify({'error': 'Contract element not found'}), 404
+    return etag_response(jsonify(element.to_dict(fields)), etag)
+
+@main.route('/contracts/templates/elements/<int:id>/templates', methods=['GET'])
+def list_element_templates(id):
+    fields, error = parse_fields(request.args, ContractTemplate.FIELDS)
+    if error:
+        return jsonify(error), 400
+
+    if db.session.get(ContractElement, id) is None:
+        return jsonify({'error': 'Contract element not found'}), 404
+
+    template_ids = select(TemplateElement.template_id).where(TemplateElement.element_id == id)
+    templates, next_cursor, error = paginate(ContractTemplate.query_with_elements(fields).filter(ContractTemplate.id.in_(template_ids)), ContractTemplate.id)
+    if error:
+        return jsonify(error), 400
+
+    templates_list = ContractTemplate.to_dict_list(templates, fields)
+    return page_response(templates_list, next_cursor)
+
 @main.route('/contracts/templates/elements/types', methods=['GET'])
 def list_supported_element_types():
     return jsonify(ELEMENT_TYPES)
@@ -153,60 +330,124 @@ def list_elements_by_type(name):
     if name not in ELEMENT_TYPES:
         return jsonify({'error': 'Invalid element type'}), 404
 
-    elements = ContractElement.query.filter_by(element_type=name).all()
-    elements_list = [element.to_dict() for element in elements]
-    return jsonify(elements_list)
+    fields, error = parse_fields(request.args, ContractElement.field_names())
+    if error:
+        return jsonify(error), 400
 
-@main.route('/contracts/templates/elements', methods=['POST'])
-def create_template_element():
-    try:
-        data = request.json
-    except Exception as e:
-        return jsonify({"error": "Invalid JSON payload"}), 400
+    query = ContractElement.query.options(*ContractElement.load_options(fields)).filter_by(element_type=name)
+    elements, next_cursor, error = paginate(query, ContractElement.id)
+    if error:
+        return jsonify(error), 400
+
+    elements_list = [element.to_dict(fields) for element in elements]
+    return page_response(elements_list, next_cursor)
 
+def element_values(data):
+    """Validate the payload of a new element, returning ``(element_class, values, error)``."""
     element_type = data.get('element_type')
     name = data.get('name')
     is_optional = data.get('is_optional', True)
 
     if element_type not in ELEMENT_TYPES:
-        return jsonify({'error': 'Invalid element type'}), 400
+        return None, None, {'error': 'Invalid element type'}
     if not name:
-        return jsonify({'error': ' Name is required to create elements'}), 400
-    existing_element = ContractElement.query.filter_by(name=name).first()
-    if existing_element:
-        return jsonify({"error": "An element with this name already exists"}), 409
+        return None, None, {'error': ' Name is required to create elements'}
+    if not isinstance(name, str) or len(name) > ContractElement.name.type.length:
+        return None, None, {'error': f'Name must be a string of at most {ContractElement.name.type.length} characters'}
+    values = {'name': name, 'is_optional': is_optional}
 
     if element_type == 'paragraph':
         text = data.get('text')
         if not text:
-            return jsonify({'error': 'Text is required for a paragraph element'}), 400
-        new_element = Paragraph(name=name, is_optional=is_optional, text=text)
+            return None, None, {'error': 'Text is required for a paragraph element'}
+        values['text'] = text
 
     elif element_type == 'image':
         url = data.get('url')
         if not url:
-            return jsonify({'error': 'URL is required for an image element'}), 400
-        new_element = Image(name=name, is_optional=is_optional, url=url)
+            return None, None, {'error': 'URL is required for an image element'}
+        values['url'] = url
 
     elif element_type == 'input_field':
-        input_types = ['phone', 'signature', 'email', 'address', 'name']
         label = data.get('label')
         input_type = data.get('input_type')
 
         if not label:
-            return jsonify({'error': 'Label is required for an input field element'}), 400
+            return None, None, {'error': 'Label is required for an input field element'}
         if not input_type:
-            return jsonify({'error': 'Input type is required for an input field element'}), 400
-        elif input_type not in input_types:
-            return jsonify({'error': f'Input type is not supported, supported input types: {input_types}'}), 400 
+            return None, None, {'error': 'Input type is required for an input field element'}
+        elif input_type not in INPUT_TYPES:
+            return None, None, {'error': f'Input type is not supported, supported input types: {INPUT_TYPES}'}
+        values['label'] = label
+        values['input_type'] = input_type
+
+    return ELEMENT_CLASSES[element_type], values, None
+
+@main.route('/contracts/templates/elements', methods=['POST'])
+def create_template_element():
+    try:
+        data = request.json
+    except Exception as e:
+        return jsonify({"error": "Invalid JSON payload"}), 400
 
-        new_element = InputField(name=name, is_optional=is_optional, label=label, input_type=input_type)
+    element_class, values, error = element_values(data)
+    if error:
+        return jsonify(error), 400
+    existing_element = ContractElement.query.filter_by(name=values['name']).first()
+    if existing_element:
+        return jsonify({"error": "An element with this name already exists"}), 409
 
+    new_element = element_class(**values)
     db.session.add(new_element)
     db.session.commit()
+    template_cache().invalidate_dependency(new_element.id)
+    validator_cache().invalidate_dependency(new_element.id)
 
     return jsonify(new_element.to_dict()), 201
 
+@main.route('/contracts/templates/elements/batch', methods=['POST'])
+def create_template_elements_batch():
+    try:
+        data = request.json
+    except Exception as e:
+        return jsonify({"error": "Invalid JSON payload"}), 400
+
+    items = data.get('elements') if isinstance(data, dict) else None
+    if not items or not isinstance(items, list):
+        return jsonify({"error": "Elements must be a non-empty list"}), 400
+    max_size = current_app.config['ELEMENT_BATCH_MAX_SIZE']
+    if len(items) > max_size:
+        return jsonify({"error": f"A batch can contain at most {max_size} elements"}), 400
+
+    validated = [element_values(item if isinstance(item, dict) else {}) for item in items]
+    names = {values['name'] for element_class, values, error in validated if not error}
+    # One query checks every name, repeated names within the batch are caught while building the rows
+    taken_names = set(db.session.scalars(select(contract_elements.c.name).where(contract_elements.c.name.in_(names)))) if names else set()
+
+    results = []
+    rows = []
+    for index, (element_class, values, error) in enumerate(validated):
+        if error:
+            results.append({'index': index, 'status': 400, **error})
+        elif values['name'] in taken_names:
+            results.append({'index': index, 'status': 409, 'error': 'An element with this name already exists'})
+        else:
+            taken_names.add(values['name'])
+            rows.append((element_class, values))
+            results.append({'index': index, 'status': 201})
+
+    if rows:
+        element_ids = ContractElement.insert_many(rows)
+        db.session.commit()
+        created = iter(zip(rows, element_ids))
+        for result in results:
+            if result['status'] == 201:
+                (element_class, values), element_id = next(created)
+                result['element'] = element_class(id=element_id, **values).to_dict()
+
+    status = 201 if len(rows) == len(items) else 207
+    return jsonify({'created': len(rows), 'failed': len(items) - len(rows), 'results': results}), status
+
 @main.route('/contracts/templates/elements/<int:id>', methods=['PUT'])
 def update_specific_element(id):
     element = ContractElement.query.get(id)
@@ -224,24 +465,42 @@ def update_specific_element(id):
         elif isinstance(element, Image):
             element.url = data.get('url', element.url)
         elif isinstance(element, InputField):
-            input_types = ['phone', 'signature', 'email', 'address', 'name']
-
             element.label = data.get('label', element.label)
             input_type = data.get('input_type', element.input_type)
-            if input_type not in input_types:
-                return jsonify({'error': f'Input type is not supported, supported input types: {input_types}'}), 400
+            if input_type not in INPUT_TYPES:
+                return jsonify({'error': f'Input type is not supported, supported input types: {INPUT_TYPES}'}), 400
+            if input_type != element.input_type:
+                ContractFieldValue.query.filter_by(element_id=element.id).update(
+                    {ContractFieldValue.input_type: input_type}, synchronize_session=False)
             element.input_type = input_type
 
+        element.version = ContractElement.version + 1
+        template_ids = select(TemplateElement.template_id).where(TemplateElement.element_id == element.id)
+        ContractTemplate.query.filter(ContractTemplate.id.in_(template_ids)).update(
+            {ContractTemplate.version: ContractTemplate.version + 1}, synchronize_session=False)
         db.session.commit()
+        template_cache().invalidate_dependency(element.id)
+        validator_cache().invalidate_dependency(element.id)
+
         return jsonify(element.to_dict())
     else:
         return jsonify({'error': 'Contract element not found'}), 404
 
 @main.route('/contracts/', methods=['GET'])
 def list_contracts():
-    contracts = Contract.query.all()
-    contracts_list = [contract.to_dict() for contract in contracts]
-    return jsonify(contracts_list)
+    criteria, error = contract_filters(request.args)
+    if error:
+        return jsonify(error), 400
+    fields, error = parse_fields(request.args, Contract.FIELDS)
+    if error:
+        return jsonify(error), 400
+
+    contracts, next_cursor, error = paginate(Contract.query.options(*Contract.load_options(fields)).filter(*criteria), Contract.id)
+    if error:
+        return jsonify(error), 400
+
+    contracts_list = [contract.to_dict(fields) for contract in contracts]
+    return page_response(contracts_list, next_cursor)
 
 @main.route('/contracts/', methods=['POST'])
 def create_contract():
@@ -266,28 +525,151 @@ def create_contract():
     if not template:
         return jsonify({'error': 'Contract template not found'}), 404
 
-    template_elements = ContractElement.query.filter(ContractElement.id.in_(template.elements)).all()
-    template_input_fields = [element for element in template_elements if isinstance(element, InputField)]
-
-    if len(contract_data.keys()) != len(template_input_fields):
-        return jsonify({'error': 'Not enough contract data for input fields'}), 400
-
-    for input_field in template_input_fields:
-        field_id = str(input_field.id)
-        if field_id not in contract_data or not contract_data.get(field_id):
-            return jsonify({'error': f'Missing contract data for input field: {input_field.name}'}), 400
+    validator = contract_validators([template])[template.id]
+    validation_error = validator.validate(contract_data)
+    if validation_error:
+        return jsonify(validation_error), 400
 
     contract = Contract(employee_id=employee_id, template_id=template_id, contract_data=contract_data, signed_date=signed_date)
+    contract.input_types = validator.input_types
     db.session.add(contract)
     db.session.commit()
 
     return jsonify(contract.to_dict()), 201
 
+@main.route('/contracts/search', methods=['POST'])
+def search_contracts():
+    try:
+        data = request.json
+    except Exception as e:
+        return jsonify({"error": "Invalid JSON payload"}), 400
+
+    contract_data = data.get('contract_data') if isinstance(data, dict) else None
+    criterion, error = contract_data_filter(contract_data)
+    if error:
+        return jsonify(error), 400
+
+    criteria, error = contract_filters(request.args)
+    if error:
+        return jsonify(error), 400
+    fields, error = parse_fields(request.args, Contract.FIELDS)
+    if error:
+        return jsonify(error), 400
+
+    contracts, next_cursor, error = paginate(Contract.query.options(*Contract.load_options(fields)).filter(criterion, *criteria), Contract.id)
+    if error:
+        return jsonify(error), 400
+
+    contracts_list = [contract.to_dict(fields) for contract in contracts]
+    return page_response(contracts_list, next_cursor)
+
+def frozen(value):
+    """Hashable form of a JSON value, equal for documents the database may store with another key order or number format."""
+    if isinstance(value, dict):
+        return frozenset((key, frozen(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(frozen(item) for item in value)
+    if isinstance(value, bool):
+        return bool, value
+    return value
+
+def contract_key(employee_id, template_id, contract_data):
+    return employee_id, template_id, frozen(contract_data)
+
+@main.route('/contracts/batch', methods=['POST'])
+def create_contracts_batch():
+    try:
+        data = request.json
+    except Exception as e:
+        return jsonify({"error": "Invalid JSON payload"}), 400
+
+    items = data.get('contracts') if isinstance(data, dict) else None
+    if not items or not isinstance(items, list):
+        return jsonify({"error": "Contracts must be a non-empty list"}), 400
+    max_size = current_app.config['CONTRACT_BATCH_MAX_SIZE']
+    if len(items) > max_size:
+        return jsonify({"error": f"A batch can contain at most {max_size} contracts"}), 400
+
+    def valid_id(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    items = [item if isinstance(item, dict) else {} for item in items]
+    employee_ids = {item.get('employee_id') for item in items if valid_id(item.get('employee_id'))}
+    template_ids = {item.get('template_id') for item in items if valid_id(item.get('template_id'))}
+
+    existing_employee_ids = set(db.session.scalars(select(Employee.id).where(Employee.id.in_(employee_ids)))) if employee_ids else set()
+    templates = ContractTemplate.query.filter(ContractTemplate.id.in_(template_ids)).all() if template_ids else []
+    validators = contract_validators(templates)
+    signed_date = datetime.utcnow().date()
+
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        contract_data = item.get('contract_data')
+        if not contract_data or not isinstance(contract_data, dict):
+            results.append({'index': index, 'status': 400, 'error': 'Contract data must be a JSON object'})
+        elif item.get('employee_id') not in existing_employee_ids:
+            results.append({'index': index, 'status': 404, 'error': 'Employee not found'})
+        elif item.get('template_id') not in validators:
+            results.append({'index': index, 'status': 404, 'error': 'Contract template not found'})
+        else:
+            validation_error = validators[item['template_id']].validate(contract_data)
+            if validation_error:
+                results.append({'index': index, 'status': 400, **validation_error})
+                continue
+            row = {'employee_id': item['employee_id'], 'template_id': item['template_id'], 'contract_data': contract_data, 'signed_date': signed_date}
+            rows.append(row)
+            results.append({'index': index, 'status': 201, 'contract': row})
+
+    if rows:
+        # Without a sorted RETURNING, which SQLite can only emulate one row at a time, the new ids are
+        # matched back to their rows by value: identical contracts are interchangeable
+        statement = insert(Contract).returning(Contract.id, Contract.employee_id, Contract.template_id, Contract.contract_data)
+        contract_ids = {}
+        for contract_id, employee_id, template_id, data in db.session.execute(statement, rows):
+            contract_ids.setdefault(contract_key(employee_id, template_id, data), []).append(contract_id)
+        field_values = []
+        for row in rows:
+            row['id'] = contract_ids[contract_key(row['employee_id'], row['template_id'], row['contract_data'])].pop()
+            field_values.extend(ContractFieldValue.rows(row['id'], row['contract_data'], validators[row['template_id']].input_types))
+        if field_values:
+            db.session.execute(insert(ContractFieldValue), field_values)
+        db.session.commit()
+
+    status = 201 if len(rows) == len(items) else 207
+    return jsonify({'created': len(rows), 'failed': len(items) - len(rows), 'results': results}), status
+
+@main.route('/contracts/export', methods=['GET'])
+def export_contracts_stream():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Export format is not supported, supported formats: {EXPORT_FORMATS}'}), 400
+
+    criteria, error = contract_filters(request.args)
+    if error:
+        return jsonify(error), 400
+
+    chunks = stream_with_context(export_contracts(criteria, export_format))
+    response = Response(chunks, mimetype=EXPORT_MIMETYPES[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename=contracts.{export_format}'
+    return response
+
 @main.route('/contracts/<int:id>', methods=['GET'])
 def get_contract(id):
-    contract = Contract.query.get(id)
+    fields, error = parse_fields(request.args, Contract.FIELDS)
+    if error:
+        return jsonify(error), 400
+
+    contract = Contract.query.options(*Contract.load_options(fields)).filter_by(id=id).first()
     if contract:
-        return jsonify(contract.to_dict())
+        return jsonify(contract.to_dict(fields))
     else:
         return jsonify({'error': 'Contract not found'}), 404
 
+@main.route('/stats/cache', methods=['GET'])
+def template_cache_stats():
+    return jsonify({'templates': template_cache().stats(), 'validators': validator_cache().stats()})
+
+@main.route('/stats/pool', methods=['GET'])
+def connection_pool_stats():
+    return jsonify({**pool_stats().stats(db.engine.pool), 'replicas': replica_pool_stats()})
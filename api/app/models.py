@@ -1,5 +1,10 @@
+import json
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, and_, event, func, insert, literal_column, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.ext.orderinglist import ordering_list
+from sqlalchemy.orm import defer, joinedload, load_only
 from . import db
 
 class Company(db.Model):
@@ -20,7 +25,7 @@ class Employee(db.Model):
     __tablename__ = 'employees'
     
     id = db.Column(db.Integer, primary_key=True)
-    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False)
 
@@ -41,22 +46,66 @@ class ContractTemplate(db.Model):
     name = db.Column(db.String(100), nullable=False)
     active = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    
-    elements = db.Column(db.ARRAY(db.Integer), nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    element_links = db.relationship('TemplateElement', order_by='TemplateElement.position', collection_class=ordering_list('position'),
+                                    cascade='all, delete-orphan')
+    elements = association_proxy('element_links', 'element_id', creator=lambda element_id: TemplateElement(element_id=element_id))
 
     __table_args__ = (UniqueConstraint('name', name='_contract_template_name_uc'),)
     
-    def to_dict(self):
-        element_mapping = {element.id: element.to_dict() for element in ContractElement.query.filter(ContractElement.id.in_(self.elements)).all()}
-        element_dicts = [element_mapping[element_id] for element_id in self.elements]
+    FIELDS = ('id', 'name', 'active', 'created_at', 'elements')
 
-        return {
-            'id': self.id,
-            'name': self.name,
-            'active': self.active,
-            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'elements': element_dicts
-        }
+    def to_dict(self, element_mapping=None, fields=None):
+        data = {field: getattr(self, field) for field in ('id', 'name', 'active') if fields is None or field in fields}
+        if fields is None or 'created_at' in fields:
+            data['created_at'] = self.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        if fields is None or 'elements' in fields:
+            if element_mapping is None:
+                element_mapping = ContractElement.dicts_by_id(list(self.elements))
+            data['elements'] = [element_mapping[element_id] for element_id in self.elements]
+        return data
+
+    @staticmethod
+    def to_dict_list(templates, fields=None):
+        element_mapping = {}
+        if fields is None or 'elements' in fields:
+            for template in templates:
+                for link in template.element_links:
+                    if link.element_id not in element_mapping:
+                        element_mapping[link.element_id] = link.element.to_dict()
+        return [template.to_dict(element_mapping, fields) for template in templates]
+
+    @staticmethod
+    def load_options(fields=None):
+        """Loader options joining the ordered elements in and fetching only the columns of ``fields``."""
+        if fields is None:
+            options = []
+        else:
+            options = [load_only(ContractTemplate.id, *[getattr(ContractTemplate, field) for field in ('name', 'active', 'created_at') if field in fields])]
+        if fields is None or 'elements' in fields:
+            options.append(joinedload(ContractTemplate.element_links).joinedload(TemplateElement.element))
+        return options
+
+    @staticmethod
+    def query_with_elements(fields=None):
+        """Query templates with their ordered elements joined in, loading only the columns of ``fields``."""
+        return ContractTemplate.query.options(*ContractTemplate.load_options(fields))
+
+    @staticmethod
+    def get_with_elements(template_id):
+        return ContractTemplate.query_with_elements().filter_by(id=template_id).one_or_none()
+
+class TemplateElement(db.Model):
+    __tablename__ = 'template_elements'
+
+    template_id = db.Column(db.Integer, db.ForeignKey('contract_templates.id'), primary_key=True)
+    position = db.Column(db.Integer, primary_key=True)
+    element_id = db.Column(db.Integer, db.ForeignKey('contract_elements.id'), nullable=False)
+
+    element = db.relationship('ContractElement')
+
+    __table_args__ = (db.Index('ix_template_elements_element_id_template_id', 'element_id', 'template_id'),)
 
 class ContractElement(db.Model):
     __tablename__ = 'contract_elements'
@@ -64,17 +113,70 @@ class ContractElement(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     is_optional = db.Column(db.Boolean, default=True)
-    element_type = db.Column(db.String(20), nullable=False)  # 'paragraph', 'image', 'input_field'
+    element_type = db.Column(db.String(20), nullable=False, index=True)  # 'paragraph', 'image', 'input_field'
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     __table_args__ = (UniqueConstraint('name', name='_contract_element_name_uc'),)
     
     __mapper_args__ = {
         'polymorphic_on': element_type,
-        'polymorphic_identity': 'contract_element'
+        'polymorphic_identity': 'contract_element',
+        'with_polymorphic': '*'
     }
 
-    def to_dict(self):
-        raise NotImplementedError("to_dict method should be implemented in subclasses")
+    # Response key -> attribute, extended by each subclass
+    FIELDS = {'id': 'id', 'type': 'element_type', 'name': 'name', 'is_optional': 'is_optional'}
+
+    def to_dict(self, fields=None):
+        return {key: getattr(self, attribute) for key, attribute in self.FIELDS.items() if fields is None or key in fields}
+
+    @staticmethod
+    def field_names():
+        return [key for subclass in (ContractElement, Paragraph, Image, InputField) for key in subclass.FIELDS
+                if subclass is ContractElement or key not in ContractElement.FIELDS]
+
+    @staticmethod
+    def load_options(fields):
+        """Loader options fetching only the columns of ``fields``, for base and subclass tables alike."""
+        if fields is None:
+            return []
+        base_columns = [getattr(ContractElement, attribute) for key, attribute in ContractElement.FIELDS.items() if key in fields]
+        options = [load_only(ContractElement.element_type, *base_columns)]
+        for subclass in (Paragraph, Image, InputField):
+            options += [defer(getattr(subclass, attribute)) for key, attribute in subclass.FIELDS.items()
+                        if key not in ContractElement.FIELDS and key not in fields]
+        return options
+
+    @staticmethod
+    def insert_many(elements):
+        """Insert ``(element_class, values)`` pairs with one bulk INSERT per table, returning the new ids in order."""
+        if not elements:
+            return []
+        base_table = ContractElement.__table__
+        base_rows = [{'element_type': element_class.__mapper__.polymorphic_identity,
+                      **{key: value for key, value in values.items() if key in base_table.c}}
+                     for element_class, values in elements]
+        if db.engine.dialect.name == 'postgresql':
+            ids = db.session.scalars(insert(base_table).returning(base_table.c.id, sort_by_parameter_order=True), base_rows).all()
+        else:
+            # SQLite can only return rows in parameter order one INSERT at a time, names are unique so match on them instead
+            ids_by_name = dict(db.session.execute(insert(base_table).returning(base_table.c.name, base_table.c.id), base_rows).all())
+            ids = [ids_by_name[row['name']] for row in base_rows]
+
+        rows_by_table = {}
+        for (element_class, values), element_id in zip(elements, ids):
+            rows_by_table.setdefault(element_class.__table__, []).append(
+                {'id': element_id, **{key: value for key, value in values.items() if key not in base_table.c}})
+        for table, rows in rows_by_table.items():
+            db.session.execute(insert(table), rows)
+        return ids
+
+    @staticmethod
+    def dicts_by_id(element_ids):
+        if not element_ids:
+            return {}
+        query = ContractElement.query.filter(ContractElement.id.in_(element_ids))
+        return {element.id: element.to_dict() for element in query}
 
 class Paragraph(ContractElement):
     __tablename__ = 'paragraphs'
@@ -86,14 +188,7 @@ class Paragraph(ContractElement):
         'polymorphic_identity': 'paragraph'
     }
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'type': self.element_type,
-            'name': self.name,
-            'text': self.text,
-            'is_optional': self.is_optional
-        }
+    FIELDS = {**ContractElement.FIELDS, 'text': 'text'}
 
 class Image(ContractElement):
     __tablename__ = 'images'
@@ -105,14 +200,7 @@ class Image(ContractElement):
         'polymorphic_identity': 'image'
     }
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'type': self.element_type,
-            'name': self.name,
-            'url': self.url,
-            'is_optional': self.is_optional
-        }
+    FIELDS = {**ContractElement.FIELDS, 'url': 'url'}
 
 class InputField(ContractElement):
     __tablename__ = 'input_fields'
@@ -125,15 +213,7 @@ class InputField(ContractElement):
         'polymorphic_identity': 'input_field'
     }
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'type': self.element_type,
-            'name': self.name,
-            'label': self.label,
-            'input_type': self.input_type,
-            'is_optional': self.is_optional
-        }
+    FIELDS = {**ContractElement.FIELDS, 'label': 'label', 'input_type': 'input_type'}
 
 class Contract(db.Model):
     __tablename__ = 'contracts'
@@ -141,15 +221,84 @@ class Contract(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employees.id'), nullable=False)
     template_id = db.Column(db.Integer, db.ForeignKey('contract_templates.id'), nullable=False)
-    contract_data = db.Column(db.JSON, nullable=False) 
-    signed_date = db.Column(db.Date, nullable=False)
+    contract_data = db.Column(db.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False)
+    signed_date = db.Column(db.Date, nullable=False, index=True)
+
+    # Composite indexes so filtered listings are served in primary key order without a sort
+    __table_args__ = (
+        db.Index('ix_contracts_employee_id_id', 'employee_id', 'id'),
+        db.Index('ix_contracts_template_id_id', 'template_id', 'id'),
+        db.Index('ix_contracts_contract_data', 'contract_data', postgresql_using='gin',
+                 postgresql_ops={'contract_data': 'jsonb_path_ops'}).ddl_if(dialect='postgresql')
+    )
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'employee_id': self.employee_id,
-            'template_id': self.template_id,
-            'contract_data': self.contract_data,
-            'signed_date': self.signed_date
-        }
+    FIELDS = ('id', 'employee_id', 'template_id', 'contract_data', 'signed_date')
+
+    # Input field id -> input type map of the template, looked up when the contract is inserted if not set
+    input_types = None
+
+    def to_dict(self, fields=None):
+        return {field: getattr(self, field) for field in self.FIELDS if fields is None or field in fields}
+
+    @staticmethod
+    def load_options(fields):
+        if fields is None:
+            return []
+        return [load_only(Contract.id, *[getattr(Contract, field) for field in Contract.FIELDS[1:] if field in fields])]
+
+class ContractFieldValue(db.Model):
+    __tablename__ = 'contract_field_values'
+
+    contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id'), primary_key=True)
+    element_id = db.Column(db.Integer, db.ForeignKey('contract_elements.id'), primary_key=True)
+    input_type = db.Column(db.String(100), nullable=False)
+    value = db.Column(db.Text, nullable=False)
+
+    # Values are unbounded, so the indexes only hold a prefix short enough for a btree entry
+    INDEXED_LENGTH = 200
+
+    __table_args__ = (
+        db.Index('ix_contract_field_values_element_id_value', 'element_id', func.substr(value, 1, INDEXED_LENGTH)),
+        db.Index('ix_contract_field_values_input_type_value', 'input_type', func.substr(value, 1, INDEXED_LENGTH)),
+    )
+
+    @staticmethod
+    def value_matches(value):
+        """Criterion matching ``value`` that the indexes can answer, through the same prefix expression."""
+        stored = ContractFieldValue.stored_value(value)
+        length = ContractFieldValue.INDEXED_LENGTH
+        # Literal arguments, as bound parameters would not match the indexed expression on SQLite. The rest
+        # is compared apart: SQLite would substitute a plain value = ? into the prefix and skip the index.
+        prefix = func.substr(ContractFieldValue.value, literal_column('1'), literal_column(str(length)))
+        rest = func.substr(ContractFieldValue.value, length + 1)
+        return and_(prefix == stored[:length], rest == stored[length:])
+
+    @staticmethod
+    def stored_value(value):
+        return value if isinstance(value, str) else json.dumps(value)
+
+    @staticmethod
+    def rows(contract_id, contract_data, input_types):
+        """Build the field value rows of a contract from its data and an input field id -> input type map."""
+        return [
+            {
+                'contract_id': contract_id,
+                'element_id': int(field_id),
+                'input_type': input_types[field_id],
+                'value': ContractFieldValue.stored_value(value)
+            }
+            for field_id, value in contract_data.items() if value and field_id in input_types
+        ]
 
+@event.listens_for(Contract, 'after_insert')
+def insert_field_values(mapper, connection, contract):
+    """Write the field values of contracts added through the ORM, bulk inserts write their own."""
+    input_types = contract.input_types
+    if input_types is None:
+        input_fields = InputField.__table__
+        field_ids = [int(field_id) for field_id in contract.contract_data if field_id.isdigit()]
+        query = select(input_fields.c.id, input_fields.c.input_type).where(input_fields.c.id.in_(field_ids))
+        input_types = {str(field_id): input_type for field_id, input_type in connection.execute(query)} if field_ids else {}
+    rows = ContractFieldValue.rows(contract.id, contract.contract_data, input_types)
+    if rows:
+        connection.execute(insert(ContractFieldValue.__table__), rows)
@@ -0,0 +1,91 @@
+import time
+from threading import Lock
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    # _do_get is a private QueuePool hook with no public equivalent that runs before the wait;
+    # SQLAlchemy is pinned in requirements.txt and test_pool_stats fails if the hook stops being called
+    def _do_get(self):
+        start = time.perf_counter()
+        record = super()._do_get()
+        record.info['pool_wait'] = time.perf_counter() - start
+        return record
+
+class PoolStats:
+    """Thread-safe connection pool counters collected from SQLAlchemy pool events."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def attach(self, engine):
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+
+    def stats(self, pool):
+        with self._lock:
+            stats = {
+                'pool_class': type(pool).__name__,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'wait_total_ms': round(self.wait_total * 1000, 3),
+                'wait_avg_ms': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3)
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), overflow=max(pool.overflow(), 0), checked_in=pool.checkedin())
+        return stats
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        wait = connection_record.info.pop('pool_wait', 0.0)
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out -= 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+def configure_pool(app):
+    """Use the timed queue pool for the configured database unless a pool class is already set."""
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if 'pool_size' in options:
+        options.setdefault('poolclass', TimedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def pool_stats():
+    return current_app.extensions['pool_stats']
+
+def replica_pool_stats():
+    """Statistics of the pool of each read replica, in the order of ``SQLALCHEMY_REPLICAS``."""
+    replicas = zip(current_app.extensions['database_replicas'], current_app.extensions['replica_pool_stats'])
+    return [stats.stats(engine.pool) for engine, stats in replicas]
@@ -0,0 +1,65 @@
+import random
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+
+READ_METHODS = ('GET', 'HEAD')
+READ_PRIMARY_COOKIE = 'read_primary'
+READ_PRIMARY_HEADER = 'X-Read-Primary'
+
+class RoutingSession(Session):
+    """Session sending the reads of GET requests to a read replica and everything else to the primary.
+
+    A request sticks to the primary once it writes, and so does every request of a client for
+    ``DATABASE_READ_YOUR_WRITES`` seconds after one of its requests wrote (see ``read_primary``).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and current_app.extensions['database_replicas'] and read_from_replica():
+            return request_replica()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+# Both events run before the session picks the bind of the statements they announce
+@event.listens_for(RoutingSession, 'before_flush')
+def flush_writes(session, flush_context, instances):
+    mark_written()
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def statement_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_written()
+
+def mark_written():
+    if has_request_context():
+        g.database_wrote = True
+
+def read_primary(cookies, headers):
+    """Whether the client asked to read its own writes, with the cookie set after a write or the header."""
+    return bool(cookies.get(READ_PRIMARY_COOKIE) or headers.get(READ_PRIMARY_HEADER))
+
+def read_from_replica():
+    if request.method not in READ_METHODS or g.get('database_wrote'):
+        return False
+    return not read_primary(request.cookies, request.headers)
+
+def request_replica():
+    """Pick the replica engine of the current request, the same one for all its queries."""
+    if 'database_replica' not in g:
+        g.database_replica = random.choice(current_app.extensions['database_replicas'])
+    return g.database_replica
+
+def set_read_primary_cookie(response):
+    if g.get('database_wrote') and response.status_code < 400:
+        response.set_cookie(READ_PRIMARY_COOKIE, '1', max_age=current_app.config['DATABASE_READ_YOUR_WRITES'], httponly=True)
+    return response
+
+def reset_routing(exception=None):
+    g.pop('database_wrote', None)
+    g.pop('database_replica', None)
+
+def init_replicas(app):
+    """Create an engine for each read replica of ``SQLALCHEMY_REPLICAS`` and route the GET requests to them."""
+    app.extensions['database_replicas'] = [create_engine(**options) for options in app.config.get('SQLALCHEMY_REPLICAS', [])]
+    if app.extensions['database_replicas']:
+        app.after_request(set_read_primary_cookie)
+        app.teardown_request(reset_routing)
@@ -0,0 +1,91 @@
+import json
+import logging
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class RequestTiming:
+    """Time spent by one request in SQL and JSON serialization."""
+    __slots__ = ('start', 'queries', 'db', 'serialize')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+
+    def server_timing(self, total):
+        app = max(total - self.db - self.serialize, 0.0)
+        return ', '.join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'serialize;dur={self.serialize * 1000:.2f}',
+            f'app;dur={app * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}'
+        ])
+
+def current_timing():
+    return g.get('request_timing') if has_request_context() else None
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_timing() is not None:
+        context.timing_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, 'timing_start', None)
+    timing = current_timing()
+    if start is not None and timing is not None:
+        timing.queries += 1
+        timing.db += time.perf_counter() - start
+
+def timed_json_provider(provider_class):
+    """Subclass ``provider_class`` so the time spent building JSON responses is added to the request timing."""
+
+    class TimedJSONProvider(provider_class):
+        def response(self, *args, **kwargs):
+            timing = current_timing()
+            if timing is None:
+                return super().response(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return super().response(*args, **kwargs)
+            finally:
+                timing.serialize += time.perf_counter() - start
+
+    TimedJSONProvider.__name__ = f'Timed{provider_class.__name__}'
+    return TimedJSONProvider
+
+def before_request():
+    g.request_timing = RequestTiming()
+
+def after_request(response):
+    timing = g.pop('request_timing', None)
+    if timing is None:
+        return response
+
+    total = time.perf_counter() - timing.start
+    response.headers['Server-Timing'] = timing.server_timing(total)
+    logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(total * 1000, 2),
+        'db_ms': round(timing.db * 1000, 2),
+        'db_queries': timing.queries,
+        'serialize_ms': round(timing.serialize * 1000, 2)
+    }))
+    return response
+
+def init_timing(app):
+    """Add a Server-Timing header and a JSON log line with SQL and serialization time to every response."""
+    if not app.config['SERVER_TIMING']:
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.json = timed_json_provider(type(app.json))(app)
+    app.before_request(before_request)
+    app.after_request(after_request)
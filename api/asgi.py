@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+import os
+from app.asgi import create_asgi_app
+from dotenv import load_dotenv
+
+load_dotenv()
+
+app = create_asgi_app(os.getenv('FLASK_CONFIG') or 'default')
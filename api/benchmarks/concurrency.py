@@ -0,0 +1,118 @@
+"""Compare throughput and latency of the sync (WSGI) and async (ASGI) read paths under concurrent load.
+
+Usage (from the api folder, against the testing database, with requirements-asgi.txt installed):
+
+    DB_POOL_SIZE=10 DB_MAX_OVERFLOW=40 python -m benchmarks.concurrency --requests 2000 --concurrency 10 --workers 8
+
+The sync path runs the Flask views on a pool of ``--workers`` threads, like a threaded WSGI
+server. The async path runs the ASGI app on one event loop with ``--concurrency`` requests in
+flight. Both are driven in-process, so the figures compare the request handling models and
+exclude HTTP parsing and network time. Both paths share the connection pool limits set by
+``DB_POOL_SIZE`` and ``DB_MAX_OVERFLOW``; keep ``--concurrency`` within the pool size, otherwise
+the async path spends its time opening and closing overflow connections.
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
+from app import create_app, db
+from app.asgi import AsyncReadApp
+from app.models import Contract
+from .endpoints import percentile
+from .seed import seed_contracts, seed_references
+
+def read_paths(dataset, contract_ids, count):
+    """Return ``count`` request paths spread over the three async read routes."""
+    routes = [
+        lambda: f'/api/contracts/templates/{random.choice(dataset.template_ids)}',
+        lambda: f'/api/contracts/{random.choice(contract_ids)}',
+        lambda: f'/api/employees/{random.choice(dataset.employee_ids)}'
+    ]
+    return [routes[i % len(routes)]() for i in range(count)]
+
+def run_sync(app, paths, workers):
+    local = threading.local()
+
+    def request(path):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        start = time.perf_counter()
+        response = local.client.get(path)
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200, f'{path}: {response.status_code}'
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        timings = list(executor.map(request, paths))
+    return time.perf_counter() - start, timings
+
+async def run_async(asgi_app, paths, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(path):
+        scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http', 'path': path,
+                 'raw_path': path.encode(), 'root_path': '', 'query_string': b'', 'headers': [], 'server': ('benchmark', 80), 'client': None}
+        status = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        async with semaphore:
+            start = time.perf_counter()
+            await asgi_app(scope, receive, send)
+            elapsed = time.perf_counter() - start
+        assert status == [200], f'{path}: {status}'
+        return elapsed
+
+    start = time.perf_counter()
+    try:
+        timings = await asyncio.gather(*[request(path) for path in paths])
+    finally:
+        await asgi_app.dispose()
+    return time.perf_counter() - start, timings
+
+def report(name, duration, timings):
+    timings = sorted(timing * 1000 for timing in timings)
+    print(f'{name:<6} {len(timings) / duration:8.0f} req/s  p50 {percentile(timings, 50):8.2f} ms  '
+          f'p95 {percentile(timings, 95):8.2f} ms  p99 {percentile(timings, 99):8.2f} ms')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--contracts', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight on the async path.')
+    parser.add_argument('--workers', type=int, default=8, help='Worker threads of the sync path.')
+    args = parser.parse_args()
+
+    random.seed(0)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        try:
+            dataset = seed_references(companies=20, employees_per_company=50, templates=20, elements=200)
+            seed_contracts(args.contracts, dataset)
+            contract_ids = db.session.scalars(select(Contract.id).limit(1000)).all()
+            paths = read_paths(dataset, contract_ids, args.requests)
+            print(f'{args.requests} requests, {args.workers} sync workers, {args.concurrency} async requests in flight '
+                  f'on {db.engine.dialect.name}, pool {db.engine.pool.status()}')
+
+            run_sync(app, paths[:100], args.workers)
+            report('sync', *run_sync(app, paths, args.workers))
+            asgi_app = AsyncReadApp(app)
+            asyncio.run(run_async(asgi_app, paths[:100], args.concurrency))
+            report('async', *asyncio.run(run_async(asgi_app, paths, args.concurrency)))
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Measure filtered contract listing latency as the contracts table grows.
+
+Usage (from the api folder, against the testing database):
+
+    python -m benchmarks.contract_filters --sizes 10000,100000,1000000
+"""
+import argparse
+import random
+import time
+from sqlalchemy import event, text
+from app import create_app, db
+from .seed import seed_contracts, seed_references
+
+def measure(client, query_string, repeat):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = client.get('/api/contracts/', query_string=query_string)
+            timings.append(time.perf_counter() - start)
+            assert response.status_code == 200
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.95) - 1] * 1000, len(statements) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000', help='Comma separated contract table sizes.')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        try:
+            dataset = seed_references()
+            employee_ids, template_ids, company_ids = dataset.employee_ids, dataset.template_ids, dataset.company_ids
+            client = app.test_client()
+            filters = {
+                'employee': {'employee_id': employee_ids[0]},
+                'template + range': {'template_id': template_ids[0], 'signed_from': '2022-01-01', 'signed_to': '2022-03-31'},
+                'company': {'company_id': company_ids[0]},
+                'company + range': {'company_id': company_ids[0], 'signed_from': '2022-01-01', 'signed_to': '2022-12-31'}
+            }
+
+            seeded = 0
+            for size in sorted(int(size) for size in args.sizes.split(',')):
+                seed_contracts(size - seeded, dataset)
+                seeded = size
+                db.session.execute(text('ANALYZE'))
+                db.session.commit()
+                for name, query_string in filters.items():
+                    median, p95, queries = measure(client, {**query_string, 'limit': args.limit}, args.repeat)
+                    print(f'{size:>9} contracts  {name:<17} median {median:7.2f} ms  p95 {p95:7.2f} ms  {queries:.0f} queries')
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
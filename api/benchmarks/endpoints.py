@@ -0,0 +1,241 @@
+"""Measure latency percentiles and SQL query counts of every API route on a seeded database.
+
+Usage (from the api folder, against the testing database):
+
+    python -m benchmarks.endpoints --contracts 100000 --output report.json
+    python -m benchmarks.endpoints --contracts 100000 --baseline report.json
+
+The JSON report has the dataset sizes, the git commit and, for every route, the latency
+percentiles in milliseconds and the SQL statements issued per request. With ``--baseline``,
+routes whose p95 latency or query count grew beyond ``--threshold`` are listed and the
+script exits with status 1.
+"""
+import argparse
+import itertools
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import event, select, text
+from app import create_app, db
+from app.models import Contract
+from .seed import seed_contracts, seed_references
+
+Case = namedtuple('Case', ['name', 'method', 'rule', 'request', 'status'])
+
+def cases(dataset):
+    """Return one benchmark case per route; ``request(i)`` builds the test client arguments of the i-th call."""
+    unique = itertools.count()
+    template_id = dataset.template_ids[0]
+    contract_data = dataset.contract_data[template_id]
+    paragraph_id = dataset.paragraph_ids[-1]
+    signature_id = int(list(contract_data)[-1])
+    contract_ids = db.session.scalars(select(Contract.id).order_by(Contract.id).limit(1000)).all()
+
+    def pick(ids, i):
+        return ids[i % len(ids)]
+
+    def contract(i):
+        template_id = pick(dataset.template_ids, i)
+        return {'employee_id': pick(dataset.employee_ids, i), 'template_id': template_id, 'contract_data': dataset.contract_data[template_id]}
+
+    return [
+        Case('ping', 'GET', '/api/ping', lambda i: {'path': '/api/ping'}, 200),
+        Case('list companies', 'GET', '/api/companies/', lambda i: {'path': '/api/companies/'}, 200),
+        Case('list employees', 'GET', '/api/employees/', lambda i: {'path': '/api/employees/'}, 200),
+        Case('get employee', 'GET', '/api/employees/<int:id>', lambda i: {'path': f'/api/employees/{pick(dataset.employee_ids, i)}'}, 200),
+        Case('create employee', 'POST', '/api/employees/', lambda i: {'path': '/api/employees/', 'json': {
+            'company_id': pick(dataset.company_ids, i), 'name': 'Benchmark hire', 'email': f'hire{next(unique)}-{time.time_ns()}@example.com'}}, 201),
+        Case('import employees', 'POST', '/api/employees/import', lambda i: {
+            'path': '/api/employees/import', 'content_type': 'text/csv', 'data': 'name,email,company_id\n' + ''.join(
+                f'Benchmark import,import{next(unique)}-{time.time_ns()}@example.com,{pick(dataset.company_ids, i)}\n' for _ in range(100))}, 200),
+        Case('list templates', 'GET', '/api/contracts/templates/', lambda i: {'path': '/api/contracts/templates/'}, 200),
+        Case('get template', 'GET', '/api/contracts/templates/<int:id>', lambda i: {'path': f'/api/contracts/templates/{pick(dataset.template_ids, i)}'}, 200),
+        Case('create template', 'POST', '/api/contracts/templates/', lambda i: {'path': '/api/contracts/templates/', 'json': {
+            'name': f'Benchmark template copy {next(unique)}-{time.time_ns()}', 'elements': dataset.paragraph_ids[:2] + [signature_id]}}, 201),
+        Case('update template', 'PUT', '/api/contracts/templates/<int:id>', lambda i: {
+            'path': f'/api/contracts/templates/{pick(dataset.template_ids, i)}', 'json': {'active': True}}, 200),
+        Case('clone template', 'POST', '/api/contracts/templates/<int:id>/clone', lambda i: {
+            'path': f'/api/contracts/templates/{pick(dataset.template_ids, i)}/clone', 'json': {
+                'name': f'Benchmark clone {next(unique)}-{time.time_ns()}', 'clone_elements': True}}, 201),
+        Case('list elements', 'GET', '/api/contracts/templates/elements/', lambda i: {'path': '/api/contracts/templates/elements/'}, 200),
+        Case('get element', 'GET', '/api/contracts/templates/elements/<int:id>', lambda i: {
+            'path': f'/api/contracts/templates/elements/{pick(dataset.paragraph_ids, i)}'}, 200),
+        Case('element templates', 'GET', '/api/contracts/templates/elements/<int:id>/templates', lambda i: {
+            'path': f'/api/contracts/templates/elements/{pick(dataset.paragraph_ids, i)}/templates'}, 200),
+        Case('element types', 'GET', '/api/contracts/templates/elements/types', lambda i: {'path': '/api/contracts/templates/elements/types'}, 200),
+        Case('elements by type', 'GET', '/api/contracts/templates/elements/type/<string:name>', lambda i: {
+            'path': '/api/contracts/templates/elements/type/paragraph'}, 200),
+        Case('create element', 'POST', '/api/contracts/templates/elements', lambda i: {'path': '/api/contracts/templates/elements', 'json': {
+            'element_type': 'paragraph', 'name': f'Benchmark clause {next(unique)}-{time.time_ns()}', 'text': 'Lorem ipsum'}}, 201),
+        Case('batch elements', 'POST', '/api/contracts/templates/elements/batch', lambda i: {'path': '/api/contracts/templates/elements/batch', 'json': {
+            'elements': [{'element_type': 'paragraph', 'name': f'Benchmark batch clause {next(unique)}-{time.time_ns()}', 'text': 'Lorem ipsum'}
+                         for _ in range(100)]}}, 201),
+        Case('update element', 'PUT', '/api/contracts/templates/elements/<int:id>', lambda i: {
+            'path': f'/api/contracts/templates/elements/{paragraph_id}', 'json': {'text': f'Lorem ipsum {i}'}}, 200),
+        Case('list contracts', 'GET', '/api/contracts/', lambda i: {'path': '/api/contracts/'}, 200),
+        Case('list contracts by employee', 'GET', '/api/contracts/', lambda i: {
+            'path': '/api/contracts/', 'query_string': {'employee_id': pick(dataset.employee_ids, i)}}, 200),
+        Case('create contract', 'POST', '/api/contracts/', lambda i: {'path': '/api/contracts/', 'json': contract(i)}, 201),
+        Case('search contracts', 'POST', '/api/contracts/search', lambda i: {'path': '/api/contracts/search', 'json': {'contract_data': contract_data}}, 200),
+        Case('batch contracts', 'POST', '/api/contracts/batch', lambda i: {'path': '/api/contracts/batch', 'json': {
+            'contracts': [contract(i + n) for n in range(100)]}}, 201),
+        Case('export contracts', 'GET', '/api/contracts/export', lambda i: {
+            'path': '/api/contracts/export', 'query_string': {'template_id': pick(dataset.template_ids, i)}}, 200),
+        Case('get contract', 'GET', '/api/contracts/<int:id>', lambda i: {'path': f'/api/contracts/{pick(contract_ids, i)}'}, 200),
+        Case('cache stats', 'GET', '/api/stats/cache', lambda i: {'path': '/api/stats/cache'}, 200),
+        Case('pool stats', 'GET', '/api/stats/pool', lambda i: {'path': '/api/stats/pool'}, 200),
+    ]
+
+def uncovered_routes(app, benchmark_cases):
+    covered = {(case.method, case.rule) for case in benchmark_cases}
+    return sorted(f'{method} {rule.rule}' for rule in app.url_map.iter_rules() if rule.endpoint.startswith('main.')
+                  for method in rule.methods - {'HEAD', 'OPTIONS'} if (method, rule.rule) not in covered)
+
+def percentile(values, percent):
+    return values[max(math.ceil(len(values) * percent / 100) - 1, 0)]
+
+def measure(client, case, repeat, warmup):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for i in range(warmup):
+        client.open(method=case.method, **case.request(i)).close()
+
+    timings = []
+    query_counts = []
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        for i in range(warmup, warmup + repeat):
+            kwargs = case.request(i)
+            del statements[:]
+            start = time.perf_counter()
+            response = client.open(method=case.method, **kwargs)
+            response.get_data()
+            timings.append(time.perf_counter() - start)
+            query_counts.append(len(statements))
+            if response.status_code != case.status:
+                raise AssertionError(f'{case.name}: expected {case.status}, got {response.status_code}: {response.get_data(as_text=True)[:200]}')
+            response.close()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    timings = sorted(timing * 1000 for timing in timings)
+    return {
+        'method': case.method,
+        'rule': case.rule,
+        'requests': repeat,
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p90_ms': round(percentile(timings, 90), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(timings[-1], 3),
+        'queries': max(query_counts),
+        'queries_mean': round(sum(query_counts) / len(query_counts), 2)
+    }
+
+def regressions(report, baseline, threshold):
+    """Compare ``report`` with ``baseline`` and describe the routes that got slower or issue more queries."""
+    found = []
+    for name, route in report['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if previous is None:
+            continue
+        if route['queries'] > previous['queries']:
+            found.append(f"{name}: {previous['queries']} -> {route['queries']} queries")
+        if route['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            found.append(f"{name}: p95 {previous['p95_ms']:.2f} ms -> {route['p95_ms']:.2f} ms")
+    return found
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--companies', type=int, default=20)
+    parser.add_argument('--employees-per-company', type=int, default=50)
+    parser.add_argument('--elements', type=int, default=200)
+    parser.add_argument('--templates', type=int, default=20)
+    parser.add_argument('--elements-per-template', type=int, default=8)
+    parser.add_argument('--contracts', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help='Comma separated case names to run.')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+    parser.add_argument('--baseline', help='JSON report to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative p95 increase over the baseline.')
+    args = parser.parse_args()
+
+    random.seed(0)
+    app = create_app('testing')
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        db.create_all()
+        try:
+            dataset = seed_references(companies=args.companies, employees_per_company=args.employees_per_company, templates=args.templates,
+                                      elements_per_template=args.elements_per_template, elements=args.elements)
+            seed_contracts(args.contracts, dataset)
+            if dialect == 'postgresql':
+                db.session.execute(text('ANALYZE'))
+                db.session.commit()
+
+            benchmark_cases = cases(dataset)
+            uncovered = uncovered_routes(app, benchmark_cases)
+            if args.only:
+                names = set(args.only.split(','))
+                benchmark_cases = [case for case in benchmark_cases if case.name in names]
+
+            client = app.test_client()
+            routes = {}
+            for case in benchmark_cases:
+                routes[case.name] = measure(client, case, args.repeat, args.warmup)
+                print(f"{case.name:<28} p50 {routes[case.name]['p50_ms']:8.2f} ms  p95 {routes[case.name]['p95_ms']:8.2f} ms  "
+                      f"{routes[case.name]['queries']:>3} queries", file=sys.stderr)
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+    report = {
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'database': dialect,
+        'dataset': {
+            'companies': args.companies,
+            'employees': args.companies * args.employees_per_company,
+            'elements': args.elements,
+            'templates': args.templates,
+            'contracts': args.contracts
+        },
+        'repeat': args.repeat,
+        'routes': routes,
+        'uncovered': uncovered
+    }
+    document = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(document + '\n')
+    else:
+        print(document)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            found = regressions(report, json.load(baseline), args.threshold)
+        for regression in found:
+            print(f'Regression: {regression}', file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Measure the bulk employee import endpoint against one POST per employee.
+
+Usage (from the api folder, against the testing database):
+
+    python -m benchmarks.import_employees --employees 100000 --duplicates 0.05
+"""
+import argparse
+import random
+import time
+from app import create_app, db
+from app.models import Company, Employee
+
+def csv_body(company_id, count, duplicates, prefix):
+    lines = ['name,email,company_id']
+    for i in range(count):
+        # Repeat an earlier email for the requested share of rows
+        n = random.randrange(i) if i and random.random() < duplicates else i
+        lines.append(f'Imported employee {n},{prefix}{n}@example.com,{company_id}')
+    return '\n'.join(lines) + '\n'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--employees', type=int, default=100000)
+    parser.add_argument('--duplicates', type=float, default=0.05, help='Share of rows repeating an earlier email.')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--posts', type=int, default=500, help='Employees created one POST at a time for comparison.')
+    args = parser.parse_args()
+
+    random.seed(0)
+    app = create_app('testing')
+    app.config['EMPLOYEE_IMPORT_CHUNK_SIZE'] = args.chunk_size
+    with app.app_context():
+        db.create_all()
+        try:
+            company = Company(name='Benchmark import company', address='123 Main St')
+            db.session.add(company)
+            db.session.commit()
+            company_id = company.id
+            client = app.test_client()
+
+            body = csv_body(company_id, args.employees, args.duplicates, 'bulk')
+            start = time.perf_counter()
+            response = client.post('/api/employees/import', data=body, content_type='text/csv')
+            elapsed = time.perf_counter() - start
+            summary = response.json
+            print(f"import    {args.employees} rows in {elapsed:8.2f} s  {args.employees / elapsed:10.0f} rows/s  "
+                  f"inserted {summary['inserted']}, skipped {summary['skipped']}, rejected {summary['rejected']}")
+
+            start = time.perf_counter()
+            for i in range(args.posts):
+                client.post('/api/employees/', json={'company_id': company_id, 'name': f'Posted employee {i}', 'email': f'post{i}@example.com'})
+            elapsed = time.perf_counter() - start
+            print(f"one POST  {args.posts} rows in {elapsed:8.2f} s  {args.posts / elapsed:10.0f} rows/s")
+            assert Employee.query.count() == summary['inserted'] + args.posts
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
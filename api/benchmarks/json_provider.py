@@ -0,0 +1,64 @@
+"""Compare JSON response generation time of the JSON providers on a large contract listing.
+
+Usage (from the api folder, no database needed):
+
+    python -m benchmarks.json_provider --contracts 10000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.json_provider import FastJSONProvider, orjson
+from app.models import Contract
+
+def build_contracts(count):
+    start_date = date(2020, 1, 1)
+    return [Contract(
+        id=i,
+        employee_id=random.randrange(1, 1000),
+        template_id=random.randrange(1, 20),
+        contract_data={str(element_id): f'Value {i}-{element_id}' for element_id in range(1, 9)},
+        signed_date=start_date + timedelta(days=random.randrange(1500))
+    ) for i in range(1, count + 1)]
+
+def measure(provider, payload, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = provider.response(payload)
+        size = len(response.get_data())
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.95) - 1] * 1000, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--contracts', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    app = create_app('testing')
+    with app.app_context():
+        contracts = build_contracts(args.contracts)
+        start = time.perf_counter()
+        payload = [contract.to_dict() for contract in contracts]
+        print(f'to_dict for {args.contracts} contracts: {(time.perf_counter() - start) * 1000:.2f} ms')
+
+        stdlib_provider = FastJSONProvider(app)
+        stdlib_provider.use_orjson = False
+        providers = {'flask default': DefaultJSONProvider(app), 'stdlib fallback': stdlib_provider}
+        if orjson is not None:
+            providers['orjson'] = FastJSONProvider(app)
+        else:
+            print('orjson is not installed, skipping it')
+
+        for name, provider in providers.items():
+            median, p95, size = measure(provider, payload, args.repeat)
+            print(f'{name:<16} median {median:8.2f} ms  p95 {p95:8.2f} ms  {size / 1024:8.0f} KiB')
+
+if __name__ == '__main__':
+    main()
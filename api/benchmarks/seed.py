@@ -0,0 +1,83 @@
+"""Synthetic data generator shared by the benchmarks."""
+import random
+from collections import namedtuple
+from datetime import date, timedelta
+from sqlalchemy import insert
+from app import db
+from app.models import Company, Contract, ContractFieldValue, ContractTemplate, Employee, Image, InputField, Paragraph
+
+Dataset = namedtuple('Dataset', ['company_ids', 'employee_ids', 'paragraph_ids', 'input_field_ids', 'template_ids', 'contract_data'])
+
+OPTIONAL_INPUT_VALUES = {
+    'name': 'Benchmark Employee',
+    'email': 'employee@example.com',
+    'phone': '+1 555 010 0000',
+    'address': '123 Main St'
+}
+
+def seed_references(companies=50, employees_per_company=200, templates=20, elements_per_template=8, elements=None):
+    """Create companies, employees, elements and valid templates and return their ids as a ``Dataset``."""
+    company_rows = [{'name': f'Benchmark company {i}', 'address': '123 Main St'} for i in range(companies)]
+    company_ids = list(db.session.scalars(insert(Company).returning(Company.id, sort_by_parameter_order=True), company_rows))
+    employee_rows = [{'company_id': company_id, 'name': f'Benchmark employee {company_id}-{i}', 'email': f'employee{company_id}-{i}@example.com'}
+                     for company_id in company_ids for i in range(employees_per_company)]
+    employee_ids = list(db.session.scalars(insert(Employee).returning(Employee.id, sort_by_parameter_order=True), employee_rows))
+
+    elements = elements or templates * elements_per_template
+    paragraphs = [Paragraph(name=f'Benchmark paragraph {i}', is_optional=False, text='Lorem ipsum dolor sit amet. ' * 20)
+                  for i in range(max(elements // 2, 2))]
+    images = [Image(name=f'Benchmark image {i}', url=f'https://example.com/{i}.png') for i in range(max(elements // 10, 1))]
+    signatures = [InputField(name=f'Benchmark signature {i}', label='Signature', is_optional=False, input_type='signature')
+                  for i in range(max(elements // 10, 1))]
+    input_types = list(OPTIONAL_INPUT_VALUES)
+    optional_fields = [InputField(name=f'Benchmark field {i}', label=input_types[i % len(input_types)].title(), input_type=input_types[i % len(input_types)])
+                       for i in range(max(elements - len(paragraphs) - len(images) - len(signatures), 1))]
+    db.session.add_all(paragraphs + images + signatures + optional_fields)
+    db.session.flush()
+
+    template_objects = []
+    contract_data = {}
+    paragraph_count = max(elements_per_template // 2, 2)
+    field_count = max(elements_per_template - paragraph_count - 2, 0)
+    for i in range(templates):
+        signature = random.choice(signatures)
+        fields = random.sample(optional_fields, min(field_count, len(optional_fields)))
+        element_ids = [paragraph.id for paragraph in random.sample(paragraphs, min(paragraph_count, len(paragraphs)))]
+        element_ids += [random.choice(images).id] + [field.id for field in fields] + [signature.id]
+        template_objects.append(ContractTemplate(name=f'Benchmark template {i}', active=True, elements=element_ids))
+        contract_data[i] = {str(field.id): OPTIONAL_INPUT_VALUES[field.input_type] for field in fields}
+        contract_data[i][str(signature.id)] = 'Signed'
+    db.session.add_all(template_objects)
+    db.session.commit()
+
+    template_ids = [template.id for template in template_objects]
+    return Dataset(
+        company_ids=company_ids,
+        employee_ids=employee_ids,
+        paragraph_ids=[paragraph.id for paragraph in paragraphs],
+        input_field_ids=[field.id for field in signatures + optional_fields],
+        template_ids=template_ids,
+        contract_data={template_ids[i]: data for i, data in contract_data.items()}
+    )
+
+def seed_contracts(count, dataset, chunk_size=10000):
+    """Sign ``count`` contracts for random employees and templates of ``dataset``, with their field values."""
+    input_types = dict(db.session.query(InputField.id, InputField.input_type).filter(InputField.id.in_(dataset.input_field_ids)))
+    input_types = {str(element_id): input_type for element_id, input_type in input_types.items()}
+    start_date = date(2020, 1, 1)
+    for offset in range(0, count, chunk_size):
+        rows = []
+        for _ in range(min(chunk_size, count - offset)):
+            template_id = random.choice(dataset.template_ids)
+            rows.append({
+                'employee_id': random.choice(dataset.employee_ids),
+                'template_id': template_id,
+                'contract_data': dataset.contract_data[template_id],
+                'signed_date': start_date + timedelta(days=random.randrange(1500))
+            })
+        contract_ids = db.session.scalars(insert(Contract).returning(Contract.id, sort_by_parameter_order=True), rows)
+        field_values = [field_value for contract_id, row in zip(contract_ids, rows)
+                        for field_value in ContractFieldValue.rows(contract_id, row['contract_data'], input_types)]
+        if field_values:
+            db.session.execute(insert(ContractFieldValue), field_values)
+        db.session.commit()
@@ -0,0 +1,83 @@
+"""Compare the aggregate validate_contract_elements with the previous ORM-based implementation.
+
+Usage (from the api folder, against the testing database):
+
+    python -m benchmarks.validate_elements --elements 250 --repeat 50
+"""
+import argparse
+import time
+from sqlalchemy import event
+from app import create_app, db
+from app.main.validators import validate_contract_elements
+from app.models import ContractElement, InputField, Paragraph
+
+def legacy_validate_contract_elements(elements):
+    existing_elements = ContractElement.query.filter(ContractElement.id.in_(elements)).all()
+    existing_element_ids = {element.id for element in existing_elements}
+    if len(existing_element_ids) != len(elements):
+        return {'error': 'Invalid element IDs'}
+
+    paragraph_count = 0
+    signature_count = 0
+    for element in existing_elements:
+        if not element.is_optional:
+            if element.element_type == 'paragraph':
+                paragraph_count += 1
+            elif element.element_type == 'input_field' and element.input_type == 'signature':
+                signature_count += 1
+
+    if paragraph_count < 2 or signature_count < 1:
+        return {'error': 'Invalid template'}
+    return None
+
+def seed(count):
+    elements = [Paragraph(name=f'Benchmark paragraph {i}', is_optional=False, text='Lorem ipsum dolor sit amet. ' * 40) for i in range(count - 1)]
+    elements.append(InputField(name='Benchmark signature', label='Signature', is_optional=False, input_type='signature'))
+    db.session.add_all(elements)
+    db.session.commit()
+    return [element.id for element in elements]
+
+def measure(validate, element_ids, repeat):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        timings = []
+        for _ in range(repeat):
+            db.session.expunge_all()
+            start = time.perf_counter()
+            assert validate(element_ids) is None
+            timings.append(time.perf_counter() - start)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    timings.sort()
+    return {
+        'median_ms': timings[len(timings) // 2] * 1000,
+        'p95_ms': timings[int(len(timings) * 0.95) - 1] * 1000,
+        'queries': len(statements) / repeat
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--elements', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        try:
+            element_ids = seed(args.elements)
+            for name, validate in (('legacy', legacy_validate_contract_elements), ('aggregate', validate_contract_elements)):
+                result = measure(validate, element_ids, args.repeat)
+                print(f"{name:>10}: median {result['median_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, {result['queries']:.0f} queries")
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+if __name__ == '__main__':
+    main()
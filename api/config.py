@@ -2,9 +2,38 @@ import os
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+def engine_options(database_uri, pool_size=5, max_overflow=10):
+    """SQLAlchemy engine options for ``database_uri``, overridable through DB_* environment variables."""
+    options = {
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    }
+    if database_uri.startswith('sqlite'):
+        return options
+
+    options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', pool_size))
+    options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', max_overflow))
+    options['pool_timeout'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))
+    if statement_timeout and database_uri.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+def replica_options(urls, pool_size=5, max_overflow=10):
+    """Engine options, including the ``url``, of each of the comma separated read replica ``urls``."""
+    urls = [url.strip() for url in (urls or '').split(',') if url.strip()]
+    return [{'url': url, **engine_options(url, pool_size, max_overflow)} for url in urls]
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'hard to guess string'
-    SQLALCHEMY_COMMIT_ON_TEARDOWN = True
+    API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 100))
+    API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 1000))
+    TEMPLATE_CACHE_SIZE = int(os.environ.get('TEMPLATE_CACHE_SIZE', 256))
+    CONTRACT_BATCH_MAX_SIZE = int(os.environ.get('CONTRACT_BATCH_MAX_SIZE', 10000))
+    ELEMENT_BATCH_MAX_SIZE = int(os.environ.get('ELEMENT_BATCH_MAX_SIZE', 1000))
+    EMPLOYEE_IMPORT_CHUNK_SIZE = int(os.environ.get('EMPLOYEE_IMPORT_CHUNK_SIZE', 1000))
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+    DATABASE_READ_YOUR_WRITES = int(os.environ.get('DATABASE_READ_YOUR_WRITES', 5))
 
     @staticmethod
     def init_app(app):
@@ -15,17 +44,23 @@ class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or \
     'sqlite:///' + os.path.join(basedir, 'data-dev.sqlite3')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=2, max_overflow=5)
+    SQLALCHEMY_REPLICAS = replica_options(os.environ.get('DEV_DATABASE_REPLICA_URLS'), pool_size=2, max_overflow=5)
 
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or \
     'sqlite:///' + os.path.join(basedir, 'data-test.sqlite3')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=2, max_overflow=5)
+    SQLALCHEMY_REPLICAS = replica_options(os.environ.get('TEST_DATABASE_REPLICA_URLS'), pool_size=2, max_overflow=5)
 
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
     'sqlite:///' + os.path.join(basedir, 'data.sqlite3')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=10, max_overflow=20)
+    SQLALCHEMY_REPLICAS = replica_options(os.environ.get('DATABASE_REPLICA_URLS'), pool_size=10, max_overflow=20)
 
 
 config = {
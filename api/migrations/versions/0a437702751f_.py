@@ -0,0 +1,50 @@
+"""store contract data as jsonb with a gin index on postgresql
+
+Revision ID: 0a437702751f
+Revises: 5ab53eca5728
+Create Date: 2026-10-18 14:21:09.663015
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0a437702751f'
+down_revision = '5ab53eca5728'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Other databases keep the JSON column and search it with json_extract
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.batch_alter_table('contracts', schema=None) as batch_op:
+        batch_op.alter_column('contract_data',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(),
+               existing_nullable=False,
+               postgresql_using='contract_data::jsonb')
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contracts_contract_data', 'contracts', ['contract_data'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'contract_data': 'jsonb_path_ops'},
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_contracts_contract_data', table_name='contracts', postgresql_concurrently=True)
+
+    with op.batch_alter_table('contracts', schema=None) as batch_op:
+        batch_op.alter_column('contract_data',
+               existing_type=postgresql.JSONB(),
+               type_=sa.JSON(),
+               existing_nullable=False,
+               postgresql_using='contract_data::json')
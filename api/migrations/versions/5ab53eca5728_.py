@@ -0,0 +1,32 @@
+"""replace contract employee and template indexes with composite keyset indexes
+
+Revision ID: 5ab53eca5728
+Revises: 99ef967ccd06
+Create Date: 2026-10-18 13:05:47.201558
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5ab53eca5728'
+down_revision = '99ef967ccd06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contracts_employee_id_id', 'contracts', ['employee_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contracts_template_id_id', 'contracts', ['template_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_contracts_employee_id', table_name='contracts', postgresql_concurrently=True)
+        op.drop_index('ix_contracts_template_id', table_name='contracts', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contracts_template_id', 'contracts', ['template_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contracts_employee_id', 'contracts', ['employee_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_contracts_template_id_id', table_name='contracts', postgresql_concurrently=True)
+        op.drop_index('ix_contracts_employee_id_id', table_name='contracts', postgresql_concurrently=True)
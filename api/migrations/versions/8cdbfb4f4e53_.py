@@ -0,0 +1,35 @@
+"""backfill contract field values
+
+Revision ID: 8cdbfb4f4e53
+Revises: da5a54af4a27
+Create Date: 2026-10-18 18:12:37.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8cdbfb4f4e53'
+down_revision = 'da5a54af4a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Contracts signed before contract_field_values existed have no rows there, searches would miss them.
+    # Empty values are not stored, like in ContractFieldValue.rows.
+    op.execute("""
+        INSERT INTO contract_field_values (contract_id, element_id, input_type, value)
+        SELECT c.id, f.id, f.input_type,
+               CASE WHEN jsonb_typeof(d.value) = 'string' THEN d.value #>> '{}' ELSE d.value::text END
+        FROM contracts c
+        CROSS JOIN LATERAL jsonb_each(c.contract_data) AS d(key, value)
+        JOIN input_fields f ON f.id::text = d.key
+        WHERE d.value NOT IN ('""', 'false', '0', 'null', '[]', '{}')
+        AND NOT EXISTS (SELECT 1 FROM contract_field_values v WHERE v.contract_id = c.id)
+    """)
+
+
+def downgrade():
+    pass
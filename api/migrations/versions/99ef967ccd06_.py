@@ -0,0 +1,44 @@
+"""add indexes for contract and employee lookups
+
+Revision ID: 99ef967ccd06
+Revises: f3eda7abeb6a
+Create Date: 2026-10-18 11:40:02.917364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '99ef967ccd06'
+down_revision = 'f3eda7abeb6a'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_contracts_employee_id', 'contracts', ['employee_id']),
+    ('ix_contracts_template_id', 'contracts', ['template_id']),
+    ('ix_contracts_signed_date', 'contracts', ['signed_date']),
+    ('ix_contract_elements_element_type', 'contract_elements', ['element_type']),
+    ('ix_employees_company_id', 'employees', ['company_id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+        if op.get_bind().dialect.name == 'postgresql':
+            op.create_index('ix_contract_templates_elements', 'contract_templates', ['elements'], unique=False,
+                            postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        if op.get_bind().dialect.name == 'postgresql':
+            op.drop_index('ix_contract_templates_elements', table_name='contract_templates', postgresql_concurrently=True)
+
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""index a bounded prefix of contract field values
+
+Revision ID: e661ee232085
+Revises: 8cdbfb4f4e53
+Create Date: 2026-10-18 18:47:05.913260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e661ee232085'
+down_revision = '8cdbfb4f4e53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL rejects btree entries over about 2.7 kB, so only the first 200 characters are indexed
+    with op.batch_alter_table('contract_field_values', schema=None) as batch_op:
+        batch_op.drop_index('ix_contract_field_values_input_type_value')
+        batch_op.drop_index('ix_contract_field_values_element_id_value')
+        batch_op.create_index('ix_contract_field_values_element_id_value', ['element_id', sa.text('substr(value, 1, 200)')], unique=False)
+        batch_op.create_index('ix_contract_field_values_input_type_value', ['input_type', sa.text('substr(value, 1, 200)')], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('contract_field_values', schema=None) as batch_op:
+        batch_op.drop_index('ix_contract_field_values_input_type_value')
+        batch_op.drop_index('ix_contract_field_values_element_id_value')
+        batch_op.create_index('ix_contract_field_values_element_id_value', ['element_id', 'value'], unique=False)
+        batch_op.create_index('ix_contract_field_values_input_type_value', ['input_type', 'value'], unique=False)
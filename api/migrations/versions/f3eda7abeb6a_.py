@@ -0,0 +1,32 @@
+"""add version columns to contract templates and elements
+
+Revision ID: f3eda7abeb6a
+Revises: b51cd5693386
+Create Date: 2026-10-18 10:12:31.482913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3eda7abeb6a'
+down_revision = 'b51cd5693386'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('contract_elements', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('contract_templates', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('contract_templates', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('contract_elements', schema=None) as batch_op:
+        batch_op.drop_column('version')
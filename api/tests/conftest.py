@@ -0,0 +1,30 @@
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements issued while the block runs."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+@contextmanager
+def assert_query_budget(budget):
+    """Fail when the block issues more than ``budget`` SQL statements."""
+    with count_queries() as statements:
+        yield statements
+    assert len(statements) <= budget, f'{len(statements)} SQL statements exceed the budget of {budget}:\n' + '\n'.join(statements)
+
+@pytest.fixture
+def query_budget():
+    """Context manager factory asserting that a block stays within a SQL statement budget."""
+    return assert_query_budget
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import pytest
+from datetime import date
+from app import db
+from app.models import Company, Employee, ContractTemplate, Contract, Paragraph, InputField
+
+pytest.importorskip('asgiref')
+
+@pytest.fixture(scope='module')
+def asgi_app():
+    """Create the ASGI app, skipping when the async driver of the test database is not installed."""
+    from app.asgi import create_asgi_app
+    from config import TestingConfig
+    pytest.importorskip('asyncpg' if TestingConfig.SQLALCHEMY_DATABASE_URI.startswith('postgresql') else 'aiosqlite')
+    asgi_app = create_asgi_app('testing')
+    with asgi_app.flask_app.app_context():
+        db.create_all()
+        yield asgi_app
+        db.session.remove()
+        db.drop_all()
+
+async def call(asgi_app, path, query_string='', headers=()):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': query_string.encode(),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 12345)
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app(scope, receive, send)
+    headers = {name.decode().lower(): value.decode() for name, value in messages[0]['headers']}
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0]['status'], headers, body
+
+def get(asgi_app, *requests):
+    """Run ``requests`` (argument tuples of ``call``) on a fresh event loop and dispose the async engines afterwards."""
+
+    async def run():
+        try:
+            return [await call(asgi_app, *request) for request in requests]
+        finally:
+            await asgi_app.dispose()
+
+    return asyncio.run(run())
+
+def test_async_database_uri():
+    """Test that the sync drivers are swapped for their async counterparts."""
+    from app.asgi import async_database_uri, async_engine_options
+    assert async_database_uri('postgresql://user:secret@db/contracts') == 'postgresql+asyncpg://user:secret@db/contracts'
+    assert async_database_uri('postgresql+psycopg2://db/contracts') == 'postgresql+asyncpg://db/contracts'
+    assert async_database_uri('sqlite:////tmp/data.sqlite3') == 'sqlite+aiosqlite:////tmp/data.sqlite3'
+    with pytest.raises(ValueError):
+        async_database_uri('mysql://db/contracts')
+
+    options = async_engine_options({'pool_size': 2, 'poolclass': object, 'connect_args': {'options': '-c statement_timeout=500'}})
+    assert options == {'pool_size': 2, 'connect_args': {'server_settings': {'statement_timeout': '500'}}}
+
+def test_async_read_routes(asgi_app):
+    """Test that the async routes answer like the Flask views."""
+    company = Company(name='Async Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Async Employee', email='async@example.com')
+    paragraph = Paragraph(name='Async Paragraph', is_optional=False, text='Sample text')
+    signature = InputField(name='Async Signature', label='Signature', is_optional=False, input_type='signature')
+    db.session.add_all([employee, paragraph, signature])
+    db.session.commit()
+    template = ContractTemplate(name='Async Template', active=True, elements=[paragraph.id, signature.id])
+    db.session.add(template)
+    db.session.commit()
+    contract = Contract(employee_id=employee.id, template_id=template.id, contract_data={str(signature.id): 'Signed'}, signed_date=date(2024, 6, 1))
+    db.session.add(contract)
+    db.session.commit()
+    employee_id, template_id, contract_id = employee.id, template.id, contract.id
+
+    client = asgi_app.flask_app.test_client()
+    paths = [f'/api/employees/{employee_id}', f'/api/contracts/{contract_id}', f'/api/contracts/templates/{template_id}']
+    responses = get(asgi_app, *[(path,) for path in paths])
+    for path, (status, headers, body) in zip(paths, responses):
+        expected = client.get(path)
+        assert status == 200
+        assert headers['content-type'] == 'application/json'
+        assert json.loads(body) == expected.json
+    assert responses[2][1]['etag'] == client.get(paths[2]).headers['ETag']
+
+    (status, headers, body), = get(asgi_app, (paths[2], '', [('If-None-Match', responses[2][1]['etag'])]))
+    assert status == 304
+    assert body == b''
+
+    (status, headers, body), = get(asgi_app, (f'/api/contracts/{contract_id}', 'fields=id,signed_date', [('Origin', 'http://localhost:8080')]))
+    assert json.loads(body) == {'id': contract_id, 'signed_date': '2024-06-01'}
+    assert headers['access-control-allow-origin'] == 'http://localhost:8080'
+
+    responses = get(asgi_app, ('/api/employees/0',), ('/api/contracts/0',), ('/api/contracts/templates/0',), (f'/api/contracts/{contract_id}', 'fields=secret'))
+    assert [status for status, headers, body in responses] == [404, 404, 404, 400]
+    assert json.loads(responses[0][2]) == {'error': 'Employee not found'}
+
+def test_async_fallback_to_flask(asgi_app):
+    """Test that the other routes are served by the Flask app."""
+    responses = get(asgi_app, ('/api/ping',), ('/api/contracts/templates/elements/types',))
+    assert responses[0][0] == 200
+    assert responses[0][2] == b'pong!'
+    assert json.loads(responses[1][2]) == ['paragraph', 'image', 'input_field']
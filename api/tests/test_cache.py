@@ -0,0 +1,51 @@
+from app.cache import LRUCache
+
+def test_get_and_set():
+    cache = LRUCache(maxsize=2)
+    assert cache.get(1, 1) is None
+    cache.set(1, 1, {'id': 1})
+    assert cache.get(1, 1) == {'id': 1}
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.set(1, 1, 'one')
+    cache.set(2, 1, 'two')
+    cache.get(1, 1)
+    cache.set(3, 1, 'three')
+
+    assert cache.get(2, 1) is None
+    assert cache.get(1, 1) == 'one'
+    assert cache.get(3, 1) == 'three'
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+def test_other_version_is_a_miss():
+    cache = LRUCache()
+    cache.set(1, 1, 'version 1')
+
+    assert cache.get(1, 2) is None
+    cache.set(1, 2, 'version 2')
+    assert cache.get(1, 2) == 'version 2'
+    assert cache.stats()['size'] == 1
+
+def test_invalidate():
+    cache = LRUCache()
+    cache.set(1, 1, 'template 1')
+    cache.invalidate(1)
+
+    assert cache.get(1, 1) is None
+    assert cache.stats()['invalidations'] == 1
+
+def test_invalidate_dependency():
+    cache = LRUCache()
+    cache.set(1, 1, 'template 1', dependencies=[10, 11])
+    cache.set(2, 1, 'template 2', dependencies=[11, 12])
+    cache.set(3, 1, 'template 3', dependencies=[12])
+
+    cache.invalidate_dependency(11)
+
+    assert cache.get(1, 1) is None
+    assert cache.get(2, 1) is None
+    assert cache.get(3, 1) == 'template 3'
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+
+@pytest.fixture(scope='module')
+def app():
+    """Create a Flask app context for testing."""
+    app = create_app('testing')
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield app
+
+@pytest.fixture(scope='module')
+def setup_database(app):
+    """Fixture to set up the database for testing."""
+    with app.app_context():
+        db.create_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+def explain(statement):
+    """Return the query plan of a statement as a single string."""
+    if db.engine.dialect.name == 'postgresql':
+        # The tables are tiny, so make sequential scans look expensive to the planner
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+        rows = db.session.execute(text(f'EXPLAIN {statement}'))
+    else:
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}'))
+    plan = '\n'.join(str(value) for row in rows for value in row)
+    db.session.rollback()
+    return plan
+
+@pytest.mark.parametrize('statement, index', [
+    ('SELECT * FROM contracts WHERE employee_id = 1', 'ix_contracts_employee_id_id'),
+    ('SELECT * FROM contracts WHERE template_id = 1', 'ix_contracts_template_id_id'),
+    ('SELECT * FROM contracts WHERE employee_id = 1 AND id > 10 ORDER BY id LIMIT 20', 'ix_contracts_employee_id_id'),
+    ("SELECT * FROM contracts WHERE signed_date BETWEEN '2024-06-01' AND '2024-06-07'", 'ix_contracts_signed_date'),
+    ("SELECT * FROM contract_elements WHERE element_type = 'paragraph'", 'ix_contract_elements_element_type'),
+    ('SELECT * FROM employees WHERE company_id = 1', 'ix_employees_company_id'),
+    ('SELECT template_id FROM template_elements WHERE element_id = 1', 'ix_template_elements_element_id_template_id'),
+])
+def test_lookup_uses_index(setup_database, statement, index):
+    assert index in explain(statement)
+
+
+def test_contract_data_search_uses_gin_index(setup_database):
+    if db.engine.dialect.name != 'postgresql':
+        pytest.skip('GIN indexes are only available on PostgreSQL')
+    assert 'ix_contracts_contract_data' in explain('SELECT id FROM contracts WHERE contract_data @> \'{"1": "jane@example.com"}\'')
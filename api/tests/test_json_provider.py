@@ -0,0 +1,38 @@
+import json
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from flask import jsonify
+from app import create_app
+from app.json_provider import FastJSONProvider, orjson
+
+@pytest.fixture(params=[True, False], ids=['orjson', 'stdlib'])
+def app(request, monkeypatch):
+    if request.param and orjson is None:
+        pytest.skip('orjson is not installed')
+    monkeypatch.setattr(FastJSONProvider, 'use_orjson', request.param)
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+def test_json_provider_is_registered(app):
+    assert isinstance(app.json, FastJSONProvider)
+
+def test_dates_and_decimals(app):
+    data = {'signed_date': date(2024, 6, 1), 'created_at': datetime(2024, 6, 1, 12, 30), 'amount': Decimal('10.50')}
+    response = jsonify(data)
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == {'signed_date': '2024-06-01', 'created_at': '2024-06-01T12:30:00', 'amount': '10.50'}
+    assert json.loads(app.json.dumps(data)) == json.loads(response.get_data())
+
+def test_dumps_with_arguments(app):
+    assert app.json.dumps({'b': 1, 'a': date(2024, 6, 1)}, indent=2) == '{\n  "a": "2024-06-01",\n  "b": 1\n}'
+
+def test_wide_integers(app):
+    data = {'amount': 2 ** 70, 'items': [-2 ** 64]}
+    assert json.loads(jsonify(data).get_data()) == data
+    assert json.loads(app.json.dumps(data)) == data
+
+def test_unsupported_types_raise(app):
+    with pytest.raises(TypeError):
+        app.json.dumps({'value': object()})
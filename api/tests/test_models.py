@@ -49,7 +49,12 @@ def test_employee_model(setup_database):
     assert employee.to_dict() == {'id': employee.id, 'company_id': company.id, 'name': 'John Doe', 'email': 'john.doe@example.com'}
     
 def test_contract_template_model(setup_database):
-    template = ContractTemplate(name='Standard Template', elements=[1, 2, 3])
+    paragraphs = [Paragraph(name=f'Template Paragraph {i}', text='Text') for i in range(3)]
+    setup_database.session.add_all(paragraphs)
+    setup_database.session.commit()
+
+    element_ids = [paragraphs[2].id, paragraphs[0].id, paragraphs[1].id]
+    template = ContractTemplate(name='Standard Template', elements=element_ids)
     setup_database.session.add(template)
     setup_database.session.commit()
 
@@ -57,6 +62,13 @@ def test_contract_template_model(setup_database):
     assert template.name == 'Standard Template'
     assert template.active is False
     assert isinstance(template.created_at, datetime)
+    assert list(template.elements) == element_ids
+    assert [link.position for link in template.element_links] == [0, 1, 2]
+
+    template.elements = element_ids[:2]
+    setup_database.session.commit()
+    setup_database.session.expire_all()
+    assert list(template.elements) == element_ids[:2]
 
 def test_contract_element_models(setup_database):
     paragraph = Paragraph(name='Intro', text='This is the introduction.')
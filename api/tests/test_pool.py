@@ -0,0 +1,59 @@
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine, exc, text
+from app.pool import PoolStats, TimedQueuePool
+from config import engine_options
+
+def test_engine_options_from_environment(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '7')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT', '5000')
+
+    options = engine_options('postgresql://localhost/contracts', pool_size=2, max_overflow=3)
+    assert options['pool_size'] == 7
+    assert options['max_overflow'] == 3
+    assert options['pool_pre_ping'] is False
+    assert options['connect_args'] == {'options': '-c statement_timeout=5000'}
+
+def test_engine_options_for_sqlite():
+    options = engine_options('sqlite:///data.sqlite3')
+    assert 'pool_size' not in options
+    assert 'connect_args' not in options
+
+def test_pool_stats():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=1)
+    stats = PoolStats()
+    stats.attach(engine)
+
+    checked_out = threading.Event()
+    held = {}
+
+    def hold_connection():
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+            held['checked_out'] = stats.stats(engine.pool)['checked_out']
+            checked_out.set()
+            time.sleep(0.05)
+
+    # A second checkout waits until the first connection is returned
+    thread = threading.Thread(target=hold_connection)
+    thread.start()
+    checked_out.wait()
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    thread.join()
+    assert held['checked_out'] == 1
+
+    result = stats.stats(engine.pool)
+    assert result['pool_class'] == 'TimedQueuePool'
+    assert result['checkouts'] == 2
+    assert result['checked_out'] == 0
+    assert result['max_checked_out'] == 1
+    assert result['connects'] == 1
+    assert result['size'] == 1
+    assert result['wait_max_ms'] >= 40
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
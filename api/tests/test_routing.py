@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from sqlalchemy import insert, update
+from app import create_app, db
+from app.models import Company, Employee
+from config import TestingConfig, engine_options, replica_options
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """Create an app with two SQLite files standing in for the primary and a read replica."""
+    primary = f"sqlite:///{tmp_path / 'primary.sqlite3'}"
+    replica = f"sqlite:///{tmp_path / 'replica.sqlite3'}"
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', primary)
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS', engine_options(primary))
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_REPLICAS', replica_options(replica))
+    app = create_app('testing')
+    with app.app_context():
+        replica_engine, = app.extensions['database_replicas']
+        db.create_all()
+        db.metadata.create_all(replica_engine)
+        db.session.add(Company(name='Primary Company', address='123 Main St'))
+        db.session.commit()
+        with replica_engine.begin() as connection:
+            connection.execute(insert(Company), [{'name': 'Replica Company', 'address': '456 Elm St'}])
+        yield app
+        db.session.remove()
+        db.drop_all()
+        replica_engine.dispose()
+
+def test_replica_options():
+    """Test that every replica URL gets its own engine options."""
+    assert replica_options(None) == []
+    replicas = replica_options(' postgresql://db-1/contracts, postgresql://db-2/contracts ', pool_size=3)
+    assert [options['url'] for options in replicas] == ['postgresql://db-1/contracts', 'postgresql://db-2/contracts']
+    assert replicas[1]['pool_size'] == 3
+
+def test_reads_go_to_replica(replica_app):
+    """Test that GET requests read from the replica and other requests from the primary."""
+    client = replica_app.test_client()
+    response = client.get('api/companies/')
+    assert [company['name'] for company in response.json] == ['Replica Company']
+    assert 'Set-Cookie' not in response.headers
+
+    response = client.post('api/employees/', json={'company_id': 1, 'name': 'Replica Employee', 'email': 'replica@example.com'})
+    assert response.status_code == 201
+    assert 'read_primary=1' in response.headers['Set-Cookie']
+
+def test_read_your_writes(replica_app):
+    """Test that a client reads from the primary after a write, or when it asks to."""
+    client = replica_app.test_client()
+    client.post('api/employees/', json={'company_id': 1, 'name': 'Replica Employee', 'email': 'replica@example.com'})
+    assert [employee['name'] for employee in client.get('api/employees/').json] == ['Replica Employee']
+
+    other_client = replica_app.test_client()
+    assert other_client.get('api/employees/').json == []
+    response = other_client.get('api/employees/', headers={'X-Read-Primary': '1'})
+    assert [employee['name'] for employee in response.json] == ['Replica Employee']
+
+    response = other_client.post('api/employees/', json={'company_id': 1, 'name': 'Duplicate', 'email': 'replica@example.com'})
+    assert response.status_code == 409
+    assert 'Set-Cookie' not in response.headers
+
+def test_request_sticks_to_primary_after_write(replica_app):
+    """Test that a GET request reads from the primary once it has written."""
+    with replica_app.test_request_context('/api/companies/', method='GET'):
+        assert db.session.get_bind(Company) is replica_app.extensions['database_replicas'][0]
+        db.session.add(Employee(company_id=1, name='Sticky Employee', email='sticky@example.com'))
+        assert [employee.name for employee in Employee.query] == ['Sticky Employee']
+        assert db.session.get_bind(Company) is db.engine
+        db.session.rollback()
+
+    # Statements executed through the session count as writes too
+    with replica_app.test_request_context('/api/companies/', method='GET'):
+        db.session.execute(update(Company).where(Company.id == 1).values(address='789 Oak St'))
+        assert db.session.get_bind(Company) is db.engine
+        assert [company.name for company in Company.query] == ['Primary Company']
+        db.session.rollback()
+
+def test_replica_pool_stats(replica_app):
+    """Test that the pool statistics report the replica pools next to the primary's."""
+    client = replica_app.test_client()
+    client.get('api/companies/')
+    response = client.get('api/stats/pool')
+    replica_stats, = response.json['replicas']
+    assert replica_stats['checkouts'] >= 1
+    assert replica_stats['checkouts'] - replica_stats['checkins'] == replica_stats['checked_out']
+
+def test_async_reads_go_to_replica(replica_app):
+    """Test that the async read routes use the replica unless the client asks for the primary."""
+    pytest.importorskip('asgiref')
+    pytest.importorskip('aiosqlite')
+    from app.asgi import AsyncReadApp
+    from tests.test_asgi import call
+
+    with replica_app.app_context():
+        db.session.add(Employee(company_id=1, name='Primary Employee', email='primary@example.com'))
+        db.session.commit()
+    asgi_app = AsyncReadApp(replica_app)
+
+    async def run():
+        try:
+            return [await call(asgi_app, '/api/employees/1'), await call(asgi_app, '/api/employees/1', '', [('Cookie', 'read_primary=1')])]
+        finally:
+            await asgi_app.dispose()
+
+    replica_response, primary_response = asyncio.run(run())
+    assert replica_response[0] == 404
+    assert primary_response[0] == 200
@@ -0,0 +1,33 @@
+import json
+import logging
+from app import create_app
+from app.timing import RequestTiming
+from config import TestingConfig
+
+def test_server_timing_header(caplog):
+    app = create_app('testing')
+    with caplog.at_level(logging.INFO, logger='app.timing'):
+        response = app.test_client().get('api/stats/cache')
+
+    assert response.status_code == 200
+    metrics = [metric.split(';')[0] for metric in response.headers['Server-Timing'].split(', ')]
+    assert metrics == ['db', 'serialize', 'app', 'total']
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['path'] == '/api/stats/cache'
+    assert record['status'] == 200
+    assert record['db_queries'] == 0
+    assert record['serialize_ms'] >= 0
+
+def test_server_timing_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'SERVER_TIMING', False)
+    app = create_app('testing')
+    response = app.test_client().get('api/ping')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+
+def test_request_timing_format():
+    timing = RequestTiming()
+    timing.queries = 2
+    timing.db = 0.003
+    timing.serialize = 0.001
+    assert timing.server_timing(0.010) == 'db;dur=3.00;desc="2 queries", serialize;dur=1.00, app;dur=6.00, total;dur=10.00'
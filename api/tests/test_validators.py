@@ -0,0 +1,36 @@
+import pytest
+from app.main.validators import ContractValidator
+from app.models import ContractTemplate, InputField
+
+@pytest.fixture
+def validator():
+    """Compile a validator from unsaved input fields."""
+    input_fields = [
+        InputField(id=1, name='Signature', label='Signature', input_type='signature', is_optional=False),
+        InputField(id=2, name='Email', label='Email', input_type='email', is_optional=False),
+        InputField(id=3, name='Phone', label='Phone', input_type='phone', is_optional=True)
+    ]
+    template = ContractTemplate(id=10, version=2, elements=[1, 2, 3, 4])
+    return ContractValidator.compile(template, input_fields)
+
+def test_compile(validator):
+    assert validator.template_id == 10
+    assert validator.version == 2
+    assert validator.required == {'1', '2'}
+    assert validator.optional == {'3'}
+    assert validator.input_types['3'] == 'phone'
+
+def test_validator_is_immutable(validator):
+    with pytest.raises(AttributeError):
+        validator.required = frozenset()
+    with pytest.raises(TypeError):
+        validator.input_types['1'] = 'text'
+
+def test_validate(validator):
+    assert validator.validate({'1': 'Signed', '2': 'john@example.com'}) is None
+    assert validator.validate({'1': 'Signed', '2': 'john@example.com', '3': '(555) 010-0000'}) is None
+    assert validator.validate({'1': 'Signed'}) == {'error': 'Missing contract data for input field: Email'}
+    assert validator.validate({'1': '', '2': 'john@example.com'}) == {'error': 'Missing contract data for input field: Signature'}
+    assert validator.validate({'1': 'Signed', '2': 'john'}) == {'error': 'Invalid email for input field: Email'}
+    assert validator.validate({'1': 'Signed', '2': 'john@example.com', '3': 'none'}) == {'error': 'Invalid phone for input field: Phone'}
+    assert validator.validate({'1': 'Signed', '2': 'john@example.com', '4': 'x'}) == {'error': 'Contract data for unknown input fields: 4'}
@@ -1,6 +1,11 @@
+import csv
+import io
+import json
 import pytest
+import secrets
+from datetime import date
 from app import create_app, db
-from app.models import Company, Employee, ContractTemplate, ContractElement, Contract, Paragraph, Image, InputField
+from app.models import Company, Employee, ContractTemplate, ContractElement, Contract, ContractFieldValue, Paragraph, Image, InputField
 
 @pytest.fixture(scope='module')
 def app():
@@ -24,7 +29,7 @@ def setup_database(app):
         db.session.remove()
         db.drop_all()
 
-def test_list_companies(client, setup_database):
+def test_list_companies(client, setup_database, query_budget):
     """Test the companies/ endpoint."""
     # Create test data
     company1 = Company(name='Company 1', address='123 Main St')
@@ -34,12 +39,13 @@ def test_list_companies(client, setup_database):
     db.session.commit()
 
     # Test GET request
-    response = client.get('api/companies/')
-    assert response.status_code == 200
-    companies = response.json
+    with query_budget(1):
+        response = client.get('api/companies/')
+        assert response.status_code == 200
+        companies = response.json
     assert len(companies) == 2
 
-def test_list_employees(client, setup_database):
+def test_list_employees(client, setup_database, query_budget):
     """Test the employees/ endpoint for listing employees."""
     # Create test data
     company = Company(name='Test Company', address='123 Main St')
@@ -53,12 +59,13 @@ def test_list_employees(client, setup_database):
     db.session.commit()
 
     # Test GET request
-    response = client.get('api/employees/')
+    with query_budget(1):
+        response = client.get('api/employees/')
     assert response.status_code == 200
     employees = response.json
     assert len(employees) == 2
 
-def test_get_employee(client, setup_database):
+def test_get_employee(client, setup_database, query_budget):
     """Test the employees/<id> endpoint for retrieving a single employee."""
     # Create test data
     company = Company(name='The Test Company', address='123 Main St')
@@ -70,11 +77,12 @@ def test_get_employee(client, setup_database):
     db.session.commit()
 
     # Test GET request
-    response = client.get(f'api/employees/{employee.id}')
+    with query_budget(1):
+        response = client.get(f'api/employees/{employee.id}')
     assert response.status_code == 200
     assert response.json['name'] == 'John Doer'
 
-def test_create_employee(client, setup_database):
+def test_create_employee(client, setup_database, query_budget):
     """Test the employees/ POST endpoint for creating employees."""
     # Create test data
     company = Company(name='Test Company 33', address='123 Main St')
@@ -87,8 +95,11 @@ def test_create_employee(client, setup_database):
         'name': 'Jane Doe',
         'email': 'jane.doe@email.com'
     }
-    response = client.post('api/employees/', json=new_employee_data)
+    with query_budget(3) as statements:
+        response = client.post('api/employees/', json=new_employee_data)
     assert response.status_code == 201
+    # The response is built from the written object, without reloading it after commit
+    assert statements[-1].startswith('INSERT')
     assert response.json['name'] == 'Jane Doe'
     assert response.json['email'] == 'jane.doe@email.com'
 
@@ -96,7 +107,8 @@ def test_create_employee(client, setup_database):
     invalid_employee_data = {
         'name': 'John Doe'
     }
-    response = client.post('api/employees/', json=invalid_employee_data)
+    with query_budget(0):
+        response = client.post('api/employees/', json=invalid_employee_data)
     assert response.status_code == 400
 
     # Test POST request with invalid email format
@@ -105,7 +117,10 @@ def test_create_employee(client, setup_database):
         'name': 'John Doe',
         'email': 'invalid_email_format'
     }
-    response = client.post('api/employees/', json=invalid_email_employee_data)
+    with query_budget(1):
+        response = client.post('api/employees/', json=invalid_email_employee_data)
+    assert response.status_code == 400
+    response = client.post('api/employees/', json={**invalid_email_employee_data, 'email': 'jane.doe@email.com junk'})
     assert response.status_code == 400
 
     # Test POST request with existing email
@@ -114,15 +129,17 @@ def test_create_employee(client, setup_database):
         'name': 'Existing Employee',
         'email': 'jane.doe@email.com'
     }
-    response = client.post('api/employees/', json=existing_employee_data)
+    with query_budget(2):
+        response = client.post('api/employees/', json=existing_employee_data)
     assert response.status_code == 409
 
     # Test POST request with invalid JSON payload
     invalid_json_payload = 'not a json'
-    response = client.post('api/employees/', data=invalid_json_payload)
+    with query_budget(0):
+        response = client.post('api/employees/', data=invalid_json_payload)
     assert response.status_code == 400
 
-def test_list_contract_templates(client, setup_database):
+def test_list_contract_templates(client, setup_database, query_budget):
     """Test GET request to list all contract templates."""
     # Create test data
     paragraph_element1 = Paragraph(name='Paragraph Element 1', is_optional=False, text='Sample text')
@@ -142,7 +159,8 @@ def test_list_contract_templates(client, setup_database):
     db.session.commit()
 
     # Make GET request
-    response = client.get('api/contracts/templates/')
+    with query_budget(1):
+        response = client.get('api/contracts/templates/')
     
     # Assert response
     assert response.status_code == 200
@@ -155,7 +173,7 @@ def test_list_contract_templates(client, setup_database):
     assert data[1]['active'] == False
     assert len(data[1]['elements']) == 3
 
-def test_get_contract_template(client, setup_database):
+def test_get_contract_template(client, setup_database, query_budget):
     """Test GET request to retrieve a single contract template."""
     # Create test data
     paragraph_element = Paragraph(name='Paragraph Element', text='Sample text')
@@ -167,7 +185,9 @@ def test_get_contract_template(client, setup_database):
     db.session.commit()
 
     # Make GET request
-    response = client.get(f'api/contracts/templates/{template.id}')
+    template_id = template.id
+    with query_budget(2):
+        response = client.get(f'api/contracts/templates/{template_id}')
     
     # Assert response
     assert response.status_code == 200
@@ -177,7 +197,7 @@ def test_get_contract_template(client, setup_database):
     assert len(data['elements']) == 1
     assert data['elements'][0]['name'] == 'Paragraph Element'
 
-def test_create_contract_template(client, setup_database):
+def test_create_contract_template(client, setup_database, query_budget):
     """Test POST request to create a new contract template."""
     paragraph_element1 = Paragraph(name='Paragraph Element ext1', is_optional=False, text='Sample text')
     paragraph_element2 = Paragraph(name='Paragraph Element ext2', is_optional=False, text='Sample text')
@@ -194,7 +214,8 @@ def test_create_contract_template(client, setup_database):
     }
 
     # Make POST request
-    response = client.post('api/contracts/templates/', json=data)
+    with query_budget(5):
+        response = client.post('api/contracts/templates/', json=data)
     
     # Assert response
     print(response.text)
@@ -208,3 +229,830 @@ def test_create_contract_template(client, setup_database):
     assert created_template is not None
     assert created_template.active == False
     assert created_template.elements == [paragraph_element1.id, paragraph_element2.id, input_field_element.id]
+
+def test_list_contract_templates_query_count(client, setup_database, query_budget):
+    """Test that listing templates issues the same queries regardless of the number of templates."""
+    paragraph_element1 = Paragraph(name='Paragraph Element qc1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element qc2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element qc', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    elements = [paragraph_element1.id, paragraph_element2.id, input_field_element.id]
+
+    db.session.expire_all()
+    with query_budget(1) as statements:
+        response = client.get('api/contracts/templates/')
+    assert response.status_code == 200
+    baseline = len(statements)
+
+    for i in range(10):
+        db.session.add(ContractTemplate(name=f'Template qc{i}', elements=elements))
+    db.session.commit()
+
+    db.session.expire_all()
+    with query_budget(1) as statements:
+        response = client.get('api/contracts/templates/')
+    assert response.status_code == 200
+    assert len(response.json) >= 10
+    assert len(statements) == baseline
+
+def test_list_template_elements_query_count(client, setup_database, query_budget):
+    """Test that listing elements loads every subclass in a fixed number of queries."""
+    def create_elements(suffix):
+        db.session.add_all([
+            Paragraph(name=f'Paragraph Element poly{suffix}', text='Sample text'),
+            Image(name=f'Image Element poly{suffix}', url='https://example.com/image.jpg'),
+            InputField(name=f'Input Field Element poly{suffix}', label='Name', input_type='email')
+        ])
+        db.session.commit()
+        db.session.expire_all()
+
+    create_elements(0)
+    with query_budget(2) as statements:
+        response = client.get('api/contracts/templates/elements/')
+    assert response.status_code == 200
+    baseline = len(statements)
+
+    for i in range(1, 6):
+        create_elements(i)
+    with query_budget(2) as statements:
+        response = client.get('api/contracts/templates/elements/')
+    assert response.status_code == 200
+    assert len(statements) == baseline
+
+    with query_budget(1):
+        response = client.get('api/contracts/templates/elements/type/input_field')
+    assert response.status_code == 200
+    assert all('input_type' in element for element in response.json)
+
+def test_list_companies_pagination(client, setup_database, query_budget):
+    """Test keyset pagination with limit and cursor on the companies/ endpoint."""
+    expected_ids = sorted(company.id for company in Company.query.all())
+    assert len(expected_ids) > 2
+
+    seen_ids = []
+    cursor = None
+    while True:
+        query_string = {'limit': 2}
+        if cursor:
+            query_string['cursor'] = cursor
+        with query_budget(1):
+            response = client.get('api/companies/', query_string=query_string)
+        assert response.status_code == 200
+        assert len(response.json) <= 2
+        seen_ids.extend(company['company_id'] for company in response.json)
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen_ids == expected_ids
+
+    # Test limits above the maximum are capped
+    with query_budget(1):
+        response = client.get('api/companies/', query_string={'limit': 10**6})
+    assert response.status_code == 200
+    assert len(response.json) == len(expected_ids)
+
+    # Test invalid limit and cursor values
+    response = client.get('api/companies/', query_string={'limit': 0})
+    assert response.status_code == 400
+    response = client.get('api/companies/', query_string={'limit': 'abc'})
+    assert response.status_code == 400
+    response = client.get('api/companies/', query_string={'cursor': 'not a cursor'})
+    assert response.status_code == 400
+
+def test_export_contracts(app, client, setup_database, query_budget):
+    """Test streaming contracts as NDJSON and CSV from the endpoint and the CLI."""
+    company = Company(name='Export Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Export Employee', email='export@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element exp1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element exp2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element exp', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([employee, paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template exp', elements=[paragraph_element1.id, paragraph_element2.id, input_field_element.id])
+    db.session.add(template)
+    db.session.commit()
+    contract_data = {str(input_field_element.id): 'Export Employee'}
+    for signed_date in (date(2024, 6, 1), date(2024, 6, 2), date(2024, 6, 2)):
+        db.session.add(Contract(employee_id=employee.id, template_id=template.id, contract_data=contract_data, signed_date=signed_date))
+    db.session.commit()
+
+    employee_id = employee.id
+    with query_budget(1):
+        response = client.get('api/contracts/export', query_string={'employee_id': employee_id})
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 3
+    assert records[0]['contract_data'] == contract_data
+    assert records[0]['signed_date'] == '2024-06-01'
+
+    with query_budget(1):
+        response = client.get('api/contracts/export', query_string={'format': 'csv', 'employee_id': employee_id, 'signed_date': '2024-06-02'})
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2
+    assert json.loads(rows[0]['contract_data']) == contract_data
+
+    response = client.get('api/contracts/export', query_string={'format': 'xml'})
+    assert response.status_code == 400
+    response = client.get('api/contracts/export', query_string={'signed_date': 'yesterday'})
+    assert response.status_code == 400
+
+    result = app.test_cli_runner().invoke(args=['export-contracts', '--template-id', str(template.id), '--batch-size', '2'])
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == 3
+
+def test_get_contract_template_cache(client, setup_database, query_budget):
+    """Test that template documents are cached and invalidated on writes."""
+    paragraph_element1 = Paragraph(name='Paragraph Element cache1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element cache2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element cache', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template cache', elements=[paragraph_element1.id, paragraph_element2.id, input_field_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    stats = client.get('api/stats/cache').json
+    response = client.get(f'api/contracts/templates/{template.id}')
+    assert response.status_code == 200
+    with query_budget(1) as statements:
+        response = client.get(f'api/contracts/templates/{template.id}')
+    assert response.status_code == 200
+    assert client.get('api/stats/cache').json['templates']['hits'] == stats['templates']['hits'] + 1
+
+    # Editing an element evicts every template containing it
+    with query_budget(4):
+        response = client.put(f'api/contracts/templates/elements/{paragraph_element1.id}', json={'text': 'Updated text'})
+    assert response.status_code == 200
+    response = client.get(f'api/contracts/templates/{template.id}')
+    assert response.json['elements'][0]['text'] == 'Updated text'
+
+    # Updating the template evicts it
+    with query_budget(3) as statements:
+        response = client.put(f'api/contracts/templates/{template.id}', json={'name': 'Template cache renamed'})
+    assert response.status_code == 200
+    assert statements[-1].startswith('UPDATE')
+    response = client.get(f'api/contracts/templates/{template.id}')
+    assert response.json['name'] == 'Template cache renamed'
+    assert client.get('api/stats/cache').json['templates']['invalidations'] == stats['templates']['invalidations'] + 2
+
+def test_contract_template_etag(client, setup_database, query_budget):
+    """Test conditional GET requests on templates and elements."""
+    paragraph_element1 = Paragraph(name='Paragraph Element etag1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element etag2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element etag', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template etag', elements=[paragraph_element1.id, paragraph_element2.id, input_field_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    response = client.get(f'api/contracts/templates/{template.id}')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    # Unchanged templates are answered from the version column alone
+    with query_budget(1) as statements:
+        response = client.get(f'api/contracts/templates/{template.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+    # Editing one of its elements changes the template ETag
+    response = client.get(f'api/contracts/templates/elements/{paragraph_element1.id}')
+    element_etag = response.headers['ETag']
+    with query_budget(1):
+        response = client.get(f'api/contracts/templates/elements/{paragraph_element1.id}', headers={'If-None-Match': element_etag})
+        assert response.status_code == 304
+    response = client.get('api/contracts/templates/elements/')
+    elements_etag = response.headers['ETag']
+    with query_budget(1):
+        response = client.get('api/contracts/templates/elements/', headers={'If-None-Match': elements_etag})
+        assert response.status_code == 304
+
+    response = client.put(f'api/contracts/templates/elements/{paragraph_element1.id}', json={'text': 'Updated text'})
+    assert response.status_code == 200
+    response = client.get(f'api/contracts/templates/elements/{paragraph_element1.id}', headers={'If-None-Match': element_etag})
+    assert response.status_code == 200
+    response = client.get('api/contracts/templates/elements/', headers={'If-None-Match': elements_etag})
+    assert response.status_code == 200
+    response = client.get(f'api/contracts/templates/{template.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['elements'][0]['text'] == 'Updated text'
+    etag = response.headers['ETag']
+
+    # Updating the template changes its ETag
+    with query_budget(3):
+        response = client.put(f'api/contracts/templates/{template.id}', json={'active': True})
+    assert response.status_code == 200
+    response = client.get(f'api/contracts/templates/{template.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['active'] == True
+
+def test_create_contracts_batch(client, setup_database, query_budget):
+    """Test POST request to sign many contracts at once with partial failures."""
+    company = Company(name='Batch Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Batch Employee', email='batch@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element batch1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element batch2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element batch', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([employee, paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template batch', elements=[paragraph_element1.id, paragraph_element2.id, input_field_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    contract_data = {str(input_field_element.id): 'Batch Employee'}
+    valid_contract = {'employee_id': employee.id, 'template_id': template.id, 'contract_data': contract_data}
+    data = {'contracts': [
+        valid_contract,
+        {'employee_id': 0, 'template_id': template.id, 'contract_data': contract_data},
+        {'employee_id': employee.id, 'template_id': 0, 'contract_data': contract_data},
+        {'employee_id': employee.id, 'template_id': template.id, 'contract_data': {}},
+        {'employee_id': employee.id, 'template_id': template.id, 'contract_data': {str(input_field_element.id): ''}},
+        valid_contract
+    ]}
+
+    with query_budget(5) as statements:
+        response = client.post('api/contracts/batch', json=data)
+    assert response.status_code == 207
+    assert response.json['created'] == 2
+    assert response.json['failed'] == 4
+    assert [result['status'] for result in response.json['results']] == [201, 404, 404, 400, 400, 201]
+
+    contract_ids = [response.json['results'][i]['contract']['id'] for i in (0, 5)]
+    contracts = Contract.query.filter(Contract.id.in_(contract_ids)).all()
+    assert len(contracts) == 2
+    assert all(contract.contract_data == contract_data for contract in contracts)
+
+    # The budget does not grow with the batch: one statement per row could not fit it
+    with query_budget(5):
+        response = client.post('api/contracts/batch', json={'contracts': [valid_contract] * 50})
+    assert response.status_code == 201
+    assert response.json['created'] == 50
+
+    # Every returned id belongs to the contract of its item
+    signatures = [{str(input_field_element.id): name} for name in ('Signer 1', 'Signer 2', 'Signer 1', 'Signer 3')]
+    response = client.post('api/contracts/batch', json={'contracts': [{**valid_contract, 'contract_data': data} for data in signatures]})
+    contract_ids = [result['contract']['id'] for result in response.json['results']]
+    assert len(set(contract_ids)) == 4
+    assert [db.session.get(Contract, contract_id).contract_data for contract_id in contract_ids] == signatures
+
+    with query_budget(0):
+        response = client.post('api/contracts/batch', json={'contracts': []})
+    assert response.status_code == 400
+
+def test_create_contract(client, setup_database, query_budget):
+    """Test POST request to sign a contract against the compiled template validator."""
+    company = Company(name='Signing Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Signing Employee', email='signing@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element sign1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element sign2', is_optional=False, text='Sample text')
+    signature_element = InputField(name='Input Field Element sign', label='Signature', is_optional=False, input_type='signature')
+    email_element = InputField(name='Input Field Element sign email', label='Email', is_optional=False, input_type='email')
+    phone_element = InputField(name='Input Field Element sign phone', label='Phone', is_optional=True, input_type='phone')
+    db.session.add_all([employee, paragraph_element1, paragraph_element2, signature_element, email_element, phone_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template sign', elements=[paragraph_element1.id, paragraph_element2.id, signature_element.id, email_element.id, phone_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    signature_id, email_id, phone_id = str(signature_element.id), str(email_element.id), str(phone_element.id)
+    contract = {'employee_id': employee.id, 'template_id': template.id}
+
+    # Optional fields can be left out
+    with query_budget(5):
+        response = client.post('api/contracts/', json={**contract, 'contract_data': {signature_id: 'Signed', email_id: 'signing@example.com'}})
+        assert response.status_code == 201
+
+    # The validator is compiled once per template version
+    with query_budget(4) as statements:
+        response = client.post('api/contracts/', json={**contract, 'contract_data': {signature_id: 'Signed', email_id: 'signing@example.com', phone_id: '+1 555 010 0000'}})
+    assert response.status_code == 201
+    assert not any('input_fields' in statement for statement in statements)
+
+    response = client.post('api/contracts/', json={**contract, 'contract_data': {signature_id: 'Signed'}})
+    assert response.status_code == 400
+    assert response.json['error'] == 'Missing contract data for input field: Input Field Element sign email'
+
+    response = client.post('api/contracts/', json={**contract, 'contract_data': {signature_id: 'Signed', email_id: 'not an email'}})
+    assert response.status_code == 400
+    assert response.json['error'] == 'Invalid email for input field: Input Field Element sign email'
+
+    response = client.post('api/contracts/', json={**contract, 'contract_data': {signature_id: 'Signed', email_id: 'signing@example.com', phone_id: 'call me'}})
+    assert response.status_code == 400
+
+    response = client.post('api/contracts/', json={**contract, 'contract_data': {signature_id: 'Signed', email_id: 'signing@example.com', '0': 'Unknown'}})
+    assert response.status_code == 400
+
+    # Editing one of the template elements recompiles the validator
+    with query_budget(4):
+        response = client.put(f'api/contracts/templates/elements/{phone_element.id}', json={'is_optional': False})
+    assert response.status_code == 200
+    with query_budget(3):
+        response = client.post('api/contracts/', json={**contract, 'contract_data': {signature_id: 'Signed', email_id: 'signing@example.com'}})
+        assert response.status_code == 400
+    assert response.json['error'] == 'Missing contract data for input field: Input Field Element sign phone'
+
+def test_contract_with_wide_integer(client, setup_database):
+    """Test that contracts holding integers wider than 64 bits are listed."""
+    company = Company(name='Wide Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Wide Employee', email='wide@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element wide1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element wide2', is_optional=False, text='Sample text')
+    signature_element = InputField(name='Input Field Element wide', label='Signature', is_optional=False, input_type='signature')
+    db.session.add_all([employee, paragraph_element1, paragraph_element2, signature_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template wide', elements=[paragraph_element1.id, paragraph_element2.id, signature_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    contract_data = {str(signature_element.id): 2 ** 70}
+    response = client.post('api/contracts/', json={'employee_id': employee.id, 'template_id': template.id, 'contract_data': contract_data})
+    assert response.status_code == 201
+    assert response.json['contract_data'] == contract_data
+
+    response = client.get(f'api/contracts/?employee_id={employee.id}')
+    assert response.status_code == 200
+    assert [contract['contract_data'] for contract in response.json] == [contract_data]
+
+def test_create_contract_template_validation(client, setup_database, query_budget):
+    """Test that template elements are validated with a single query."""
+    paragraph_element1 = Paragraph(name='Paragraph Element val1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element val2', is_optional=False, text='Sample text')
+    optional_paragraph_element = Paragraph(name='Paragraph Element val3', is_optional=True, text='Sample text')
+    signature_element = InputField(name='Input Field Element val', label='Name', is_optional=False, input_type='signature')
+    optional_signature_element = InputField(name='Input Field Element val optional', label='Name', is_optional=True, input_type='signature')
+    db.session.add_all([paragraph_element1, paragraph_element2, optional_paragraph_element, signature_element, optional_signature_element])
+    db.session.commit()
+
+    def create(elements):
+        return client.post('api/contracts/templates/', json={'name': 'Template val', 'elements': elements})
+
+    elements = [paragraph_element1.id, paragraph_element1.id, signature_element.id]
+    with query_budget(1):
+        response = create(elements)
+    assert response.json['error'] == 'Duplicate elements are not allowed'
+
+    elements = [paragraph_element1.id, paragraph_element2.id, signature_element.id, 0]
+    with query_budget(2):
+        response = create(elements)
+    assert response.json['error'] == 'Invalid element IDs(doesn`t exist): 0'
+
+    response = create([paragraph_element1.id, signature_element.id])
+    assert response.json['error'] == 'A contract template must have at least three elements'
+
+    response = create([paragraph_element1.id, optional_paragraph_element.id, signature_element.id])
+    assert response.json['error'] == 'A contract template must have at least two paragraphs non optionals'
+
+    elements = [paragraph_element1.id, paragraph_element2.id, optional_signature_element.id]
+    with query_budget(2) as statements:
+        response = create(elements)
+    assert response.status_code == 400
+    assert response.json['error'] == 'A contract template must have at least one input field of type "signature" non optional'
+    assert sum('contract_elements' in statement for statement in statements) == 1
+
+def test_list_contracts_filters(client, setup_database, query_budget):
+    """Test filtering the contracts/ endpoint by employee, template, company and signed date."""
+    company = Company(name='Filter Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee1 = Employee(company_id=company.id, name='Filter Employee 1', email='filter1@example.com')
+    employee2 = Employee(company_id=company.id, name='Filter Employee 2', email='filter2@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element filter1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element filter2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element filter', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([employee1, employee2, paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    elements = [paragraph_element1.id, paragraph_element2.id, input_field_element.id]
+    template1 = ContractTemplate(name='Template filter1', elements=elements)
+    template2 = ContractTemplate(name='Template filter2', elements=elements)
+    db.session.add_all([template1, template2])
+    db.session.commit()
+
+    contract_data = {str(input_field_element.id): 'Signed'}
+    for employee, template, signed_date in ((employee1, template1, date(2024, 5, 30)),
+                                            (employee1, template2, date(2024, 6, 3)),
+                                            (employee2, template1, date(2024, 6, 5)),
+                                            (employee2, template1, date(2024, 6, 10))):
+        db.session.add(Contract(employee_id=employee.id, template_id=template.id, contract_data=contract_data, signed_date=signed_date))
+    db.session.commit()
+
+    def list_contracts(**query_string):
+        with query_budget(1) as statements:
+            response = client.get('api/contracts/', query_string=query_string)
+        assert response.status_code == 200
+        return response.json
+
+    assert len(list_contracts(company_id=company.id)) == 4
+    assert len(list_contracts(employee_id=employee1.id)) == 2
+    assert len(list_contracts(template_id=template1.id)) == 3
+    assert len(list_contracts(company_id=company.id, signed_from='2024-06-01', signed_to='2024-06-07')) == 2
+    assert len(list_contracts(employee_id=employee2.id, template_id=template1.id, signed_from='2024-06-06')) == 1
+
+    with query_budget(1):
+        response = client.get('api/contracts/', query_string={'company_id': company.id, 'limit': 3})
+    assert len(response.json) == 3
+    with query_budget(1):
+        response = client.get('api/contracts/', query_string={'company_id': company.id, 'limit': 3, 'cursor': response.headers['X-Next-Cursor']})
+    assert len(response.json) == 1
+    assert 'X-Next-Cursor' not in response.headers
+
+    with query_budget(0):
+        response = client.get('api/contracts/', query_string={'employee_id': 'abc'})
+    assert response.status_code == 400
+    response = client.get('api/contracts/', query_string={'signed_from': '06/01/2024'})
+    assert response.status_code == 400
+
+def test_search_contracts(client, setup_database, query_budget):
+    """Test POST request to search contracts by contract data values."""
+    company = Company(name='Search Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Search Employee', email='search@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element search1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element search2', is_optional=False, text='Sample text')
+    signature_element = InputField(name='Input Field Element search', label='Name', is_optional=False, input_type='signature')
+    email_element = InputField(name='Input Field Element search email', label='Email', is_optional=False, input_type='email')
+    db.session.add_all([employee, paragraph_element1, paragraph_element2, signature_element, email_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template search', elements=[paragraph_element1.id, paragraph_element2.id, signature_element.id, email_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    signature_id, email_id = str(signature_element.id), str(email_element.id)
+    # Contracts added through the ORM get their field values too
+    for signature, email in (('Jane', 'jane@example.com'), ('John', 'john@example.com'), ('Jane', 'jane@example.org')):
+        contract_data = {signature_id: signature, email_id: email}
+        db.session.add(Contract(employee_id=employee.id, template_id=template.id, contract_data=contract_data, signed_date=date(2024, 6, 1)))
+    db.session.commit()
+
+    with query_budget(1) as statements:
+        response = client.post('api/contracts/search', json={'contract_data': {email_id: 'john@example.com'}})
+    # Without JSONB the lookup goes through the indexed contract_field_values
+    assert ('contract_field_values' in statements[0]) != (db.engine.dialect.name == 'postgresql')
+    assert response.status_code == 200
+    assert len(response.json) == 1
+    assert response.json[0]['contract_data'][signature_id] == 'John'
+
+    response = client.post('api/contracts/search', json={'contract_data': {signature_id: 'Jane'}})
+    assert len(response.json) == 2
+
+    response = client.post('api/contracts/search', json={'contract_data': {signature_id: 'Jane', email_id: 'jane@example.org'}})
+    assert len(response.json) == 1
+
+    with query_budget(1):
+        response = client.post('api/contracts/search', query_string={'limit': 1}, json={'contract_data': {signature_id: 'Jane'}})
+    assert len(response.json) == 1
+    assert 'X-Next-Cursor' in response.headers
+
+    response = client.post('api/contracts/search', json={'contract_data': {signature_id: 'Nobody'}})
+    assert response.json == []
+
+    with query_budget(0):
+        response = client.post('api/contracts/search', json={'contract_data': {}})
+    assert response.status_code == 400
+
+def test_contract_field_values(app, client, setup_database, query_budget):
+    """Test that signing a contract writes its field values and that they can be backfilled."""
+    company = Company(name='Field Values Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Field Values Employee', email='fieldvalues@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element values1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element values2', is_optional=False, text='Sample text')
+    signature_element = InputField(name='Input Field Element values', label='Name', is_optional=False, input_type='signature')
+    address_element = InputField(name='Input Field Element values address', label='Address', is_optional=True, input_type='address')
+    db.session.add_all([employee, paragraph_element1, paragraph_element2, signature_element, address_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template values', elements=[paragraph_element1.id, paragraph_element2.id, signature_element.id, address_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    signature_id, address_id = str(signature_element.id), str(address_element.id)
+    employee_id, template_id = employee.id, template.id
+    with query_budget(5):
+        response = client.post('api/contracts/', json={'employee_id': employee_id, 'template_id': template_id, 'contract_data': {signature_id: 'Signed', address_id: '1 Main St'}})
+    assert response.status_code == 201
+    contract_id = response.json['id']
+    with query_budget(5):
+        response = client.post('api/contracts/batch', json={'contracts': [{'employee_id': employee_id, 'template_id': template_id, 'contract_data': {signature_id: 'Signed'}}]})
+    assert response.status_code == 201
+    batch_contract_id = response.json['results'][0]['contract']['id']
+
+    values = ContractFieldValue.query.filter_by(contract_id=contract_id).order_by(ContractFieldValue.element_id).all()
+    assert [(value.element_id, value.input_type, value.value) for value in values] == [
+        (signature_element.id, 'signature', 'Signed'),
+        (address_element.id, 'address', '1 Main St')
+    ]
+    assert ContractFieldValue.query.filter_by(contract_id=batch_contract_id).count() == 1
+    assert ContractFieldValue.query.filter_by(input_type='address', value='1 Main St').count() == 1
+
+    # Contracts created before the side table existed are picked up by the backfill
+    ContractFieldValue.query.filter(ContractFieldValue.contract_id.in_([contract_id, batch_contract_id])).delete()
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=['backfill-field-values', '--chunk-size', '2'])
+    assert result.exit_code == 0
+    assert ContractFieldValue.query.filter_by(contract_id=contract_id).count() == 2
+    assert ContractFieldValue.query.filter_by(contract_id=batch_contract_id).count() == 1
+
+    # Changing the input type of a field relabels the values already stored for it
+    with query_budget(4) as statements:
+        response = client.put(f'api/contracts/templates/elements/{address_id}', json={'input_type': 'name'})
+    assert response.status_code == 200
+    assert any(statement.startswith('UPDATE contract_field_values') for statement in statements)
+    assert ContractFieldValue.query.filter_by(element_id=address_element.id, input_type='address').count() == 0
+    assert ContractFieldValue.query.filter_by(element_id=address_element.id, input_type='name').count() == 1
+    assert ContractFieldValue.query.filter_by(element_id=signature_element.id, input_type='signature').count() == 2
+
+def test_template_element_links(client, setup_database, query_budget):
+    """Test loading templates with their elements in one query and looking up templates by element."""
+    paragraph_element1 = Paragraph(name='Paragraph Element link1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element link2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element link', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    element_ids = [input_field_element.id, paragraph_element2.id, paragraph_element1.id]
+    template1 = ContractTemplate(name='Template link1', elements=element_ids)
+    template2 = ContractTemplate(name='Template link2', elements=[paragraph_element1.id, paragraph_element2.id, input_field_element.id])
+    db.session.add_all([template1, template2])
+    db.session.commit()
+    template1_id, template2_id = template1.id, template2.id
+
+    # A cache miss loads the template and its elements with one joined query
+    with query_budget(2) as statements:
+        response = client.get(f'api/contracts/templates/{template1_id}')
+    assert response.status_code == 200
+    assert [element['id'] for element in response.json['elements']] == element_ids
+    assert len(statements) == 2
+
+    with query_budget(2):
+        response = client.get(f'api/contracts/templates/elements/{input_field_element.id}/templates')
+    assert response.status_code == 200
+    assert [template['id'] for template in response.json] == [template1_id, template2_id]
+
+    # Replacing the elements of a template updates the reverse lookup
+    paragraph_element3 = Paragraph(name='Paragraph Element link3', is_optional=False, text='Sample text')
+    db.session.add(paragraph_element3)
+    db.session.commit()
+    element_ids = [paragraph_element3.id, paragraph_element1.id, input_field_element.id]
+    with query_budget(5):
+        response = client.put(f'api/contracts/templates/{template1_id}', json={'elements': element_ids})
+    assert response.status_code == 200
+    assert [element['id'] for element in response.json['elements']] == element_ids
+
+    response = client.get(f'api/contracts/templates/elements/{paragraph_element2.id}/templates')
+    assert [template['id'] for template in response.json] == [template2_id]
+    response = client.get(f'api/contracts/templates/elements/{paragraph_element3.id}/templates')
+    assert [template['id'] for template in response.json] == [template1_id]
+    response = client.get('api/contracts/templates/elements/999999/templates')
+    assert response.status_code == 404
+
+def test_connection_pool_stats(client, setup_database, query_budget):
+    """Test GET request to report connection pool statistics."""
+    with query_budget(0):
+        response = client.get('api/stats/pool')
+    assert response.status_code == 200
+    assert response.json['checkouts'] >= 1
+    assert response.json['checked_out'] >= 0
+    assert response.json['checkouts'] - response.json['checkins'] == response.json['checked_out']
+    assert response.json['replicas'] == []
+
+def test_server_timing(client, setup_database, query_budget):
+    """Test that responses report the SQL statements they issued in the Server-Timing header."""
+    with query_budget(1) as statements:
+        response = client.get('api/contracts/templates/')
+    assert response.status_code == 200
+    assert f'desc="{len(statements)} queries"' in response.headers['Server-Timing']
+
+def test_sparse_fieldsets(client, setup_database, query_budget):
+    """Test that ?fields= trims the response and the columns fetched from the database."""
+    company = Company(name='Fields Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Fields Employee', email='fields@example.com')
+    paragraph_element1 = Paragraph(name='Paragraph Element fields1', is_optional=False, text='Sample text')
+    paragraph_element2 = Paragraph(name='Paragraph Element fields2', is_optional=False, text='Sample text')
+    input_field_element = InputField(name='Input Field Element fields', label='Name', is_optional=False, input_type='signature')
+    db.session.add_all([employee, paragraph_element1, paragraph_element2, input_field_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template fields', elements=[paragraph_element1.id, paragraph_element2.id, input_field_element.id])
+    db.session.add(template)
+    db.session.commit()
+    contract = Contract(employee_id=employee.id, template_id=template.id, contract_data={str(input_field_element.id): 'Signed'}, signed_date=date(2024, 6, 1))
+    db.session.add(contract)
+    db.session.commit()
+    template_id, contract_id, paragraph_id, employee_id = template.id, contract.id, paragraph_element1.id, employee.id
+    db.session.expire_all()
+
+    with query_budget(2) as statements:
+        response = client.get('api/contracts/templates/elements/', query_string={'fields': 'id,name,type'})
+    assert response.status_code == 200
+    assert all(set(element) == {'id', 'name', 'type'} for element in response.json)
+    assert not any('paragraphs.text' in statement or 'input_fields.label' in statement for statement in statements)
+
+    with query_budget(1) as statements:
+        response = client.get('api/contracts/templates/elements/type/paragraph', query_string={'fields': 'id,text'})
+    assert all(set(element) == {'id', 'text'} for element in response.json)
+    assert 'paragraphs.text' in statements[0]
+
+    response = client.get(f'api/contracts/templates/elements/{paragraph_id}', query_string={'fields': 'name'})
+    assert response.json == {'name': 'Paragraph Element fields1'}
+
+    with query_budget(1) as statements:
+        response = client.get('api/contracts/templates/', query_string={'fields': 'id,name'})
+    assert all(set(template) == {'id', 'name'} for template in response.json)
+    assert 'template_elements' not in statements[0]
+
+    full_etag = client.get(f'api/contracts/templates/{template_id}').headers['ETag']
+    response = client.get(f'api/contracts/templates/{template_id}', query_string={'fields': 'id,elements'})
+    assert set(response.json) == {'id', 'elements'}
+    assert len(response.json['elements']) == 3
+    assert response.headers['ETag'] != full_etag
+
+    with query_budget(2) as statements:
+        response = client.get('api/contracts/', query_string={'employee_id': employee_id, 'fields': 'id,signed_date'})
+    assert response.json == [{'id': contract_id, 'signed_date': '2024-06-01'}]
+    assert 'contract_data' not in statements[-1].split('FROM')[0]
+    response = client.get(f'api/contracts/{contract_id}', query_string={'fields': 'template_id'})
+    assert response.json == {'template_id': template_id}
+
+    response = client.get('api/contracts/', query_string={'fields': 'id,password'})
+    assert response.status_code == 400
+    assert response.json['error'] == 'Unknown fields: password'
+    response = client.get('api/contracts/templates/elements/', query_string={'fields': 'elements'})
+    assert response.status_code == 400
+
+def test_import_employees(app, client, setup_database, query_budget, monkeypatch):
+    """Test importing employees from CSV and NDJSON in chunks with duplicates and invalid rows."""
+    company = Company(name='Import Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    db.session.add(Employee(company_id=company.id, name='Existing Employee', email='existing@import.com'))
+    db.session.commit()
+    company_id = company.id
+    monkeypatch.setitem(app.config, 'EMPLOYEE_IMPORT_CHUNK_SIZE', 2)
+
+    body = '\n'.join([
+        'name,email,company_id',
+        f'Ada Lovelace,ada@import.com,{company_id}',
+        f'Alan Turing,alan@import.com,{company_id}',
+        f'Ada Again,ada@import.com,{company_id}',
+        f'Existing Again,existing@import.com,{company_id}',
+        f'Grace Hopper,not-an-email,{company_id}',
+        f'Trailing Junk,junk@import.com junk,{company_id}',
+        'No Company,nocompany@import.com,',
+        'Unknown Company,unknown@import.com,999999',
+        f'Edsger Dijkstra,edsger@import.com,{company_id}'
+    ]) + '\n'
+    # Per chunk of two valid rows: one company lookup and one INSERT ... ON CONFLICT
+    with query_budget(6):
+        response = client.post('api/employees/import', data=body, content_type='text/csv')
+    assert response.status_code == 200
+    assert response.json['inserted'] == 3
+    assert response.json['skipped'] == 2
+    assert response.json['rejected'] == 4
+    assert response.json['errors'] == [
+        {'line': 6, 'error': 'Email is not valid'},
+        {'line': 7, 'error': 'Email is not valid'},
+        {'line': 8, 'error': 'Missing or invalid company_id'},
+        {'line': 9, 'error': 'Company not found'}
+    ]
+    assert Employee.query.filter(Employee.email.like('%@import.com')).count() == 4
+
+    body = '\n'.join([
+        json.dumps({'name': 'Barbara Liskov', 'email': 'barbara@import.com'}),
+        json.dumps({'name': 'Alan Turing', 'email': 'alan@import.com'}),
+        'not json',
+        ''
+    ])
+    response = client.post('api/employees/import', query_string={'format': 'ndjson', 'company_id': company_id}, data=body)
+    assert response.json == {'inserted': 1, 'skipped': 1, 'rejected': 1, 'errors': [{'line': 3, 'error': 'Invalid record'}]}
+
+    response = client.post('api/employees/import', query_string={'format': 'xlsx'}, data='')
+    assert response.status_code == 400
+    response = client.post('api/employees/import', data=b'name,email\n\xff\xfe,broken\n', content_type='text/csv')
+    assert response.status_code == 400
+
+    result = app.test_cli_runner().invoke(args=['import-employees', '--company-id', str(company_id)],
+                                          input='name,email\nKen Thompson,ken@import.com\nKen Thompson,ken@import.com\n')
+    assert result.exit_code == 0
+    assert 'Imported 1 employees, skipped 1 duplicates, rejected 0 rows' in result.output
+
+def test_create_template_elements_batch(client, setup_database, query_budget):
+    """Test POST request to create many elements at once with one INSERT per table."""
+    db.session.add(Paragraph(name='Existing batch element', is_optional=False, text='Sample text'))
+    db.session.commit()
+
+    data = {'elements': [
+        {'element_type': 'paragraph', 'name': 'Batch paragraph 1', 'text': 'First'},
+        {'element_type': 'input_field', 'name': 'Batch signature', 'label': 'Signature', 'input_type': 'signature', 'is_optional': False},
+        {'element_type': 'paragraph', 'name': 'Existing batch element', 'text': 'Taken'},
+        {'element_type': 'paragraph', 'name': 'Batch paragraph 1', 'text': 'Repeated'},
+        {'element_type': 'image', 'name': 'Batch image'},
+        {'element_type': 'video', 'name': 'Batch video'},
+        {'element_type': 'paragraph', 'name': 'Batch paragraph 2', 'text': 'Second'}
+    ]}
+    # One name check, one INSERT into contract_elements and one into each element type table
+    with query_budget(4) as statements:
+        response = client.post('api/contracts/templates/elements/batch', json=data)
+    assert statements[-1].startswith('INSERT')
+    assert response.status_code == 207
+    assert response.json['created'] == 3
+    assert response.json['failed'] == 4
+    results = response.json['results']
+    assert [result['status'] for result in results] == [201, 201, 409, 409, 400, 400, 201]
+    assert results[4]['error'] == 'URL is required for an image element'
+
+    for result in (results[0], results[1], results[6]):
+        element = db.session.get(ContractElement, result['element']['id'])
+        assert element.to_dict() == result['element']
+    assert results[1]['element']['type'] == 'input_field'
+    assert results[1]['element']['is_optional'] is False
+    assert results[6]['element']['is_optional'] is True
+
+    # The budget does not grow with the batch: one statement per row could not fit it
+    elements = [{'element_type': 'paragraph', 'name': f'Batch paragraph {n + 3}', 'text': 'More'} for n in range(50)]
+    elements.append({'element_type': 'image', 'name': 'Batch image', 'url': 'https://example.com/a.png'})
+    with query_budget(4):
+        response = client.post('api/contracts/templates/elements/batch', json={'elements': elements})
+    assert response.status_code == 201
+    assert response.json['created'] == 51
+
+    with query_budget(0):
+        response = client.post('api/contracts/templates/elements/batch', json={'elements': []})
+    assert response.status_code == 400
+
+def test_clone_contract_template(client, setup_database, query_budget):
+    """Test POST request to clone a template, sharing or copying its elements."""
+    paragraph = Paragraph(name='Clone paragraph', is_optional=False, text='Sample text')
+    signature = InputField(name='Clone signature', label='Signature', is_optional=False, input_type='signature')
+    db.session.add_all([paragraph, signature])
+    db.session.commit()
+    template = ContractTemplate(name='Clone source', active=True, elements=[signature.id, paragraph.id])
+    db.session.add(template)
+    db.session.commit()
+    source = client.get(f'api/contracts/templates/{template.id}').json
+
+    with query_budget(4) as statements:
+        response = client.post(f'api/contracts/templates/{template.id}/clone', json={'name': 'Shared clone'})
+    assert statements[-1].startswith('INSERT')
+    assert response.status_code == 201
+    assert response.json['active'] is True
+    assert response.json['elements'] == source['elements']
+    assert client.get(f"api/contracts/templates/{response.json['id']}").json['elements'] == source['elements']
+
+    # Source and name checks, the name check of the copies, their INSERTs and the template with its links
+    with query_budget(8):
+        response = client.post(f'api/contracts/templates/{template.id}/clone', json={'name': 'Copied clone', 'active': False, 'clone_elements': True})
+    assert response.status_code == 201
+    assert response.json['active'] is False
+    copies = response.json['elements']
+    assert [element['name'] for element in copies] == ['Clone signature (Copied clone)', 'Clone paragraph (Copied clone)']
+    assert {element['id'] for element in copies}.isdisjoint(element['id'] for element in source['elements'])
+    assert [{**element, 'id': None, 'name': None} for element in copies] == [{**element, 'id': None, 'name': None} for element in source['elements']]
+    assert client.get(f"api/contracts/templates/{response.json['id']}").json['elements'] == copies
+
+    response = client.post(f'api/contracts/templates/{template.id}/clone', json={'name': 'Shared clone'})
+    assert response.status_code == 409
+    response = client.post(f'api/contracts/templates/{template.id}/clone', json={'name': 'Another clone', 'clone_elements': True, 'element_suffix': ' (Copied clone)'})
+    assert response.status_code == 409
+    assert ContractTemplate.query.filter_by(name='Another clone').first() is None
+    response = client.post(f'api/contracts/templates/{template.id}/clone', json={})
+    assert response.status_code == 400
+    response = client.post('api/contracts/templates/0/clone', json={'name': 'Missing clone'})
+    assert response.status_code == 404
+
+def test_long_field_values(client, setup_database):
+    """Test that values too long for a btree entry can be stored and searched."""
+    company = Company(name='Long Values Company', address='123 Main St')
+    db.session.add(company)
+    db.session.commit()
+    employee = Employee(company_id=company.id, name='Long Values Employee', email='longvalues@example.com')
+    address_element = InputField(name='Input Field Element long address', label='Address', is_optional=False, input_type='address')
+    db.session.add_all([employee, address_element])
+    db.session.commit()
+    template = ContractTemplate(name='Template long values', elements=[address_element.id])
+    db.session.add(template)
+    db.session.commit()
+
+    address_id = str(address_element.id)
+    address = secrets.token_hex(4000)
+    response = client.post('api/contracts/', json={'employee_id': employee.id, 'template_id': template.id, 'contract_data': {address_id: address}})
+    assert response.status_code == 201
+    contract_id = response.json['id']
+    response = client.post('api/contracts/search', json={'contract_data': {address_id: address}})
+    assert [contract['id'] for contract in response.json] == [contract_id]
+    assert ContractFieldValue.query.filter(ContractFieldValue.value_matches(address)).count() == 1
+    response = client.post('api/contracts/search', json={'contract_data': {address_id: address[:-1] + 'x'}})
+    assert response.json == []
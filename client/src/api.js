@@ -0,0 +1,22 @@
+// List endpoints return one page at a time, with the cursor of the next page in the X-Next-Cursor header
+export function fetchPage(path, cursor = null) {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  return fetch(process.env.VUE_APP_API_URL + path + query)
+    .then(response => {
+      if (!response.ok) {
+        throw new Error(`${path} answered ${response.status} ${response.statusText}`);
+      }
+      return response.json().then(items => ({ items, nextCursor: response.headers.get('X-Next-Cursor') }));
+    });
+}
+
+// Pick lists need more than one page but stop after a few rather than downloading the whole collection
+export const MAX_PAGES = 5;
+
+export function fetchAll(path, maxPages = MAX_PAGES, cursor = null, items = []) {
+  return fetchPage(path, cursor)
+    .then(page => {
+      items.push(...page.items);
+      return page.nextCursor && maxPages > 1 ? fetchAll(path, maxPages - 1, page.nextCursor, items) : items;
+    });
+}